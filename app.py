@@ -1,38 +1,166 @@
 from flask import Flask
 from flask_restful import Api, Resource
 from flask_cors import CORS
-from flask_migrate import Migrate
 from models import db
+from db_pool import engine_options, pool_stats, ping
+from replicas import replica_binds, replica_router, ReplicaRouter
+from cache import response_cache, ResponseCache
+from view_counter import ViewCounter
+from metrics import RequestMetrics
+from query_audit import QueryAudit
+from compression import Compression
+import json_provider
+import search
 from dotenv import load_dotenv
-from resources.blogs_resource import BlogPosts, BlogPostBySlug
+from resources.blogs_resource import BlogPosts, BlogPostBySlug, PostSearch
+from resources.bulk_resource import BulkPosts
+from resources.export_resource import PostExport
+from serializers import init_serializers
+from cli import LazyGroup
 import os
 
 load_dotenv()
 
-# Initialize Flask app
-app = Flask(__name__)
-CORS(app)  
+# Define a HealthCheck Resource
+class HealthCheck(Resource):
+    def get(self):
+        return {'status': 'OK'},
 
-app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv("CONNECTION_STRING")
+# Expose response cache counters
+class CacheStats(Resource):
+    def get(self):
+        return response_cache.stats()
 
-db.init_app(app)
+# Report connection pool occupancy and checkout latency
+class DatabaseStats(Resource):
+    def get(self):
+        stats = pool_stats(db.engine)
+        try:
+            stats['ping_ms'] = ping(db.engine)
+        except Exception as e:
+            return dict(stats, status='unavailable', message=str(e)), 503
+        if replica_router.enabled:
+            stats['replicas'] = replica_router.status()
+        return dict(stats, status='OK')
 
 
-migrate = Migrate(app, db)
+def create_app(config=None, warm=None):
+    """
+    Build the Flask app from the environment, with `config` overriding it.
+    Migration and maintenance CLI code is only imported when a `flask db` or
+    `flask posts` command runs, so web workers boot without alembic.
+    """
+    # Initialize Flask app
+    app = Flask(__name__)
+    CORS(app)
 
-# Initialize Flask-RESTful API
-api = Api(app)
+    app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv("CONNECTION_STRING")
+
+    # Connection pool per worker: "queue" (sized, pre-pinged, recycled) or "null" (no pooling, for PgBouncer transaction mode)
+    app.config['DB_POOL_MODE'] = os.getenv("DB_POOL_MODE", "queue")
+    app.config['DB_POOL_SIZE'] = int(os.getenv("DB_POOL_SIZE", 5))
+    app.config['DB_MAX_OVERFLOW'] = int(os.getenv("DB_MAX_OVERFLOW", 10))
+    app.config['DB_POOL_TIMEOUT'] = float(os.getenv("DB_POOL_TIMEOUT", 30))
+    app.config['DB_POOL_RECYCLE'] = int(os.getenv("DB_POOL_RECYCLE", 1800))
+    app.config['DB_POOL_PRE_PING'] = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+
+    # Read replicas (comma separated URLs) serving GET/HEAD reads; a client that just wrote reads the primary for a while
+    app.config['REPLICA_URLS'] = os.getenv("REPLICA_URLS")
+    app.config['REPLICA_CHECK_INTERVAL'] = float(os.getenv("REPLICA_CHECK_INTERVAL", 5.0))
+    app.config['REPLICA_MAX_LAG'] = float(os.getenv("REPLICA_MAX_LAG")) if os.getenv("REPLICA_MAX_LAG") else None
+    app.config['REPLICA_STICKY_SECONDS'] = int(os.getenv("REPLICA_STICKY_SECONDS", 5))
+
+    # In-process cache of GET responses (size limit in bytes, TTL in seconds)
+    app.config['RESPONSE_CACHE_ENABLED'] = os.getenv("RESPONSE_CACHE_ENABLED", "true").lower() == "true"
+    app.config['RESPONSE_CACHE_MAX_BYTES'] = int(os.getenv("RESPONSE_CACHE_MAX_BYTES", 32 * 1024 * 1024))
+    app.config['RESPONSE_CACHE_TTL'] = float(os.getenv("RESPONSE_CACHE_TTL", 60))
+
+    # Cross-worker cache invalidation: local (default; every worker on one host), postgres (LISTEN/NOTIFY,
+    # several hosts) or none (only safe with a single process, or with the response cache off)
+    app.config['CACHE_BUS'] = os.getenv("CACHE_BUS", "local")
+    app.config['CACHE_BUS_DIR'] = os.getenv("CACHE_BUS_DIR")
+    app.config['CACHE_BUS_URL'] = os.getenv("CACHE_BUS_URL")
+    app.config['CACHE_BUS_POLL_INTERVAL'] = float(os.getenv("CACHE_BUS_POLL_INTERVAL", 1.0))
+
+    # Buffered view counting: flushed every interval (seconds) or once max pending views are buffered
+    app.config['VIEW_COUNTS_ENABLED'] = os.getenv("VIEW_COUNTS_ENABLED", "true").lower() == "true"
+    app.config['VIEW_FLUSH_INTERVAL'] = float(os.getenv("VIEW_FLUSH_INTERVAL", 5.0))
+    app.config['VIEW_FLUSH_MAX_PENDING'] = int(os.getenv("VIEW_FLUSH_MAX_PENDING", 1000))
+
+    # Per-endpoint latency/query/serialization metrics at /metrics (METRICS_DIR aggregates gunicorn workers)
+    app.config['METRICS_ENABLED'] = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+    app.config['METRICS_SERVER_TIMING'] = os.getenv("METRICS_SERVER_TIMING", "false").lower() == "true"
+    app.config['METRICS_DIR'] = os.getenv("METRICS_DIR")
+    app.config['METRICS_FLUSH_INTERVAL'] = float(os.getenv("METRICS_FLUSH_INTERVAL", 10.0))
+
+    # Query auditing (N+1 patterns, slow queries with plans): off, log, warn or raise
+    app.config['QUERY_AUDIT_MODE'] = os.getenv("QUERY_AUDIT_MODE", "off")
+    app.config['QUERY_AUDIT_SLOW_MS'] = float(os.getenv("QUERY_AUDIT_SLOW_MS", 200))
+    app.config['QUERY_AUDIT_REPEAT_THRESHOLD'] = int(os.getenv("QUERY_AUDIT_REPEAT_THRESHOLD", 5))
+    app.config['QUERY_AUDIT_EXPLAIN'] = os.getenv("QUERY_AUDIT_EXPLAIN", "true").lower() == "true"
+
+    # Response compression (gzip; br and zstd when brotli/zstandard are installed) above a size threshold
+    app.config['COMPRESS_ENABLED'] = os.getenv("COMPRESS_ENABLED", "true").lower() == "true"
+    app.config['COMPRESS_MIN_SIZE'] = int(os.getenv("COMPRESS_MIN_SIZE", 1024))
+    app.config['COMPRESS_ENCODINGS'] = os.getenv("COMPRESS_ENCODINGS", "br,zstd,gzip")
+
+    # JSON encoding: orjson when installed (auto), or force orjson/stdlib
+    app.config['JSON_BACKEND'] = os.getenv("JSON_BACKEND", "auto")
+    app.config['JSON_SORT_KEYS'] = os.getenv("JSON_SORT_KEYS", "false").lower() == "true"
+
+    # Startup warm-up: configure mappers and compile serializers (before gunicorn forks, with preload)
+    app.config['APP_WARMUP'] = os.getenv("APP_WARMUP", "true").lower() == "true"
+
+    app.config.update(config or {})
+    app.config.setdefault('SQLALCHEMY_ENGINE_OPTIONS', engine_options(app.config))
+    app.config.setdefault('SQLALCHEMY_BINDS', replica_binds(app.config))
+
+    db.init_app(app)
+    search.init_app(app)
+    # Fresh instances per app, reachable as app.extensions[...] and through the module-level proxies
+    ReplicaRouter().init_app(app)
+    ResponseCache().init_app(app)
+    ViewCounter().init_app(app)
+    RequestMetrics().init_app(app)
+    QueryAudit().init_app(app)
+    # After the metrics hook so response sizes are counted compressed
+    Compression().init_app(app)
+
+    # Compile the per-model serializers once, before any request (or fork)
+    if app.config['APP_WARMUP'] if warm is None else warm:
+        init_serializers()
+
+    # Register CLI commands (flask db ..., flask posts ...); imported on first use
+    app.cli.add_command(LazyGroup('db', 'flask_migrate.cli:db', setup=lambda: _init_migrate(app),
+                                  help='Perform database migrations.'))
+    app.cli.add_command(LazyGroup('posts', 'commands:posts_cli', help='Post maintenance commands.'))
+
+    # Initialize Flask-RESTful API
+    api = Api(app)
+    # One JSON encoder for jsonify() and Flask-RESTful's dict responses
+    json_provider.init_app(app, api)
+
+    # Add resource to API
+    api.add_resource(HealthCheck, '/api/v1/health')
+    api.add_resource(CacheStats, '/api/v1/health/cache')
+    api.add_resource(DatabaseStats, '/api/v1/health/db')
+    api.add_resource(PostSearch, '/api/v1/posts/search')
+    api.add_resource(BulkPosts, '/api/v1/posts/bulk')
+    api.add_resource(PostExport, '/api/v1/posts/export')
+    api.add_resource(BlogPosts, '/api/v1/posts', '/api/v1/posts/<string:post_id>')
+    api.add_resource(BlogPostBySlug, '/api/v1/posts/slug/<string:slug>')
+
+    return app
+
+
+def _init_migrate(app):
+    from flask_migrate import Migrate
+    Migrate(app, db)
 
-# Define a HealthCheck Resource
-class HealthCheck(Resource):
-    def get(self):
-        return {'status': 'OK'},
 
-# Add resource to API
-api.add_resource(HealthCheck, '/api/v1/health')
-api.add_resource(BlogPosts, '/api/v1/posts', '/api/v1/posts/<string:post_id>')
-api.add_resource(BlogPostBySlug, '/api/v1/posts/slug/<string:slug>')
+# Module-level app for gunicorn (app:app), seed.py and the benchmarks
+app = create_app()
 
 # Run the app
 if __name__ == '__main__':
-    app.run(debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
+    app.run(debug=True, host='0.0.0.0', port=5000)
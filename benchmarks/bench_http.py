@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""HTTP load benchmark of the real API routes on a synthetic corpus.
+
+Tops up the database to --posts rows (see dataset.py), serves the app from a
+threaded in-process server, and drives a weighted mix of list, slug,
+tag-filter and create requests from --concurrency keep-alive clients for
+--duration seconds. Prints (and with --json, writes) throughput, latency
+percentiles and SQL queries per request, overall and per route.
+
+Mixes with writes (create) run against a throwaway copy of the database (a
+file copy on SQLite, CREATE DATABASE ... TEMPLATE on Postgres), so the
+corpus stays the same from one run to the next.
+
+Use CONNECTION_STRING to benchmark Postgres instead of SQLite, or --url to
+load an already running server (queries per request are then only reported
+if it sends X-Query-Count).
+
+Usage: python benchmarks/bench_http.py [--posts 10000] [--concurrency 16] [--duration 20]
+       [--mix list=40,slug=30,filter=20,create=10] [--cache] [--json results.json]
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import threading
+import uuid
+
+parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+parser.add_argument('--posts', type=int, default=10_000)
+parser.add_argument('--db', help='SQLite file (default /tmp/http-bench-<posts>.db)')
+parser.add_argument('--concurrency', type=int, default=16)
+parser.add_argument('--duration', type=float, default=20.0)
+parser.add_argument('--warmup', type=float, default=2.0)
+parser.add_argument('--mix', default='list=40,slug=30,filter=20,create=10')
+parser.add_argument('--cache', action='store_true', help='Leave the response cache on')
+parser.add_argument('--url', help='Benchmark this running server instead of an in-process one')
+parser.add_argument('--port', type=int, default=8766)
+parser.add_argument('--json', help='Also write the report to this file')
+args = parser.parse_args()
+
+os.environ.setdefault('CONNECTION_STRING', f'sqlite:///{args.db or f"/tmp/http-bench-{args.posts}.db"}')
+os.environ['RESPONSE_CACHE_ENABLED'] = 'true' if args.cache else 'false'
+os.environ.setdefault('VIEW_FLUSH_INTERVAL', '1')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import create_engine, event, select, text  # noqa: E402
+from sqlalchemy.pool import NullPool  # noqa: E402
+from werkzeug.serving import WSGIRequestHandler, make_server  # noqa: E402
+from app import app, create_app  # noqa: E402
+from models import db, User  # noqa: E402
+import dataset  # noqa: E402
+from loadgen import run_load, wait_until_up  # noqa: E402
+
+MIX = {}
+for part in args.mix.split(','):
+    name, _, weight = part.partition('=')
+    MIX[name.strip()] = float(weight or 1)
+
+# Request kinds that change the database
+WRITES = {'create'}
+AUTHORS = []
+
+
+REQUESTS = {
+    'list': lambda rng: ('GET', f'/api/v1/posts?page={rng.randint(1, 20)}', None),
+    'cursor': lambda rng: ('GET', '/api/v1/posts?after=&per_page=20', None),
+    'slug': lambda rng: ('GET', f'/api/v1/posts/slug/{dataset.slug_for(rng.randrange(args.posts))}', None),
+    'filter': lambda rng: ('GET', f'/api/v1/posts?status=published&tag={dataset.pick_tag(rng)}', None),
+    'search': lambda rng: ('GET', f'/api/v1/posts/search?q={rng.choice(dataset.WORDS)}', None),
+    'create': lambda rng: ('POST', '/api/v1/posts', {
+        'title': f'Load test {uuid.UUID(int=rng.getrandbits(128))}',
+        'body': ' '.join(rng.choices(dataset.WORDS, k=200)),
+        'status': 'published',
+        'author_id': rng.choice(AUTHORS),
+        'tags': [dataset.pick_tag(rng), dataset.pick_tag(rng)],
+    }),
+}
+
+
+class QuietHandler(WSGIRequestHandler):
+    def log_request(self, *args, **kwargs):
+        pass
+
+
+def make_request(rng):
+    label = rng.choices(list(MIX), list(MIX.values()))[0]
+    method, path, body = REQUESTS[label](rng)
+    return method, path, body, label
+
+
+def count_queries(target):
+    """Report the SQL statements each request to `target` ran in an X-Query-Count header"""
+    local = threading.local()
+    with target.app_context():
+        engine = db.engine
+
+    @event.listens_for(engine, 'before_cursor_execute')
+    def count(conn, cursor, statement, parameters, context, executemany):
+        local.count = getattr(local, 'count', 0) + 1
+
+    @target.before_request
+    def reset():
+        local.count = 0
+
+    @target.after_request
+    def report(response):
+        response.headers['X-Query-Count'] = str(getattr(local, 'count', 0))
+        return response
+
+
+def scratch_copy(url):
+    """Copy the database at `url` for a write mix; returns the copy's URL and a function dropping it"""
+    if url.get_backend_name() == 'sqlite':
+        fd, path = tempfile.mkstemp(prefix='http-bench-copy-', suffix='.db')
+        os.close(fd)
+        shutil.copyfile(url.database, path)
+        return url.set(database=path), lambda: os.remove(path)
+    if url.get_backend_name() == 'postgresql':
+        name = f'{url.database}_bench_{os.getpid()}'
+        admin = create_engine(url.set(database='postgres'), isolation_level='AUTOCOMMIT', poolclass=NullPool)
+        # TEMPLATE needs the source database to have no other sessions
+        with admin.connect() as connection:
+            connection.execute(text(f'CREATE DATABASE "{name}" TEMPLATE "{url.database}"'))
+
+        def drop():
+            with admin.connect() as connection:
+                connection.execute(text(f'DROP DATABASE IF EXISTS "{name}"'))
+        return url.set(database=name), drop
+    parser.error(f'Write mixes need a SQLite or Postgres database to copy, not {url.get_backend_name()}')
+
+
+def main():
+    unknown = set(MIX) - set(REQUESTS)
+    if unknown:
+        parser.error(f'Unknown request kinds in --mix: {", ".join(sorted(unknown))}')
+
+    server = None
+    with app.app_context():
+        db.create_all()
+        print(f'Preparing {args.posts} posts in {db.engine.url}...', file=sys.stderr)
+        dataset.generate(db, args.posts, progress=lambda line: print(line, file=sys.stderr))
+        AUTHORS.extend(db.session.scalars(select(User.id).where(User.email.like('bench-%@example.org'))))
+        database_url = db.engine.url
+        dialect = db.engine.dialect.name
+        db.session.remove()
+        db.engine.dispose()
+
+    writes = WRITES & set(MIX)
+    target, drop_copy = app, None
+    if writes and args.url:
+        print(f'Warning: {", ".join(sorted(writes))} requests write to {args.url}\'s database', file=sys.stderr)
+    elif writes:
+        copy_url, drop_copy = scratch_copy(database_url)
+        print(f'Write mix: serving a copy of the database ({copy_url.database})', file=sys.stderr)
+        target = create_app({'SQLALCHEMY_DATABASE_URI': copy_url.render_as_string(hide_password=False)})
+
+    base_url = args.url
+    if not base_url:
+        count_queries(target)
+        server = make_server('127.0.0.1', args.port, target, threaded=True, request_handler=QuietHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        base_url = f'http://127.0.0.1:{args.port}'
+    try:
+        wait_until_up(base_url)
+        result = run_load(base_url, make_request, args.concurrency, args.duration, args.warmup)
+    finally:
+        if server is not None:
+            server.shutdown()
+        if drop_copy is not None:
+            with target.app_context():
+                target.extensions['view_counter'].flush()
+                for engine in db.engines.values():
+                    engine.dispose()
+            drop_copy()
+
+    report = {
+        'config': {
+            'posts': args.posts, 'dialect': dialect, 'concurrency': args.concurrency,
+            'duration': args.duration, 'mix': MIX, 'response_cache': args.cache,
+            'server': base_url if args.url else 'in-process (werkzeug, threaded)',
+            'python': platform.python_version(),
+        },
+        'results': result,
+    }
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.json:
+        with open(args.json, 'w') as f:
+            f.write(output + '\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""Encode a 100-post listing page with each JSON backend.
+
+Compares Flask's default provider with json_provider.JSONProvider on the
+stdlib and (when installed) orjson backends, for the page as the API sends it
+(dates already ISO strings) and with native datetime/UUID values.
+
+Usage: python benchmarks/bench_json.py [--posts 100] [--number 200] [--repeat 5]
+"""
+import argparse
+import os
+import sys
+import timeit
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from flask import Flask  # noqa: E402
+from flask.json.provider import DefaultJSONProvider  # noqa: E402
+from bench_serializers import build_posts  # noqa: E402
+from json_provider import JSONProvider, orjson  # noqa: E402
+from serializers import POST_FIELDSETS, init_serializers, serialize_post  # noqa: E402
+
+
+def native_page(posts):
+    """The same page with datetimes and UUIDs left as Python objects"""
+    page = []
+    for post in posts:
+        page.append({
+            'id': uuid.UUID(post.id), 'title': post.title, 'slug': post.slug, 'excerpt': post.excerpt,
+            'status': post.status, 'views': post.views, 'created_at': post.created_at,
+            'updated_at': post.updated_at, 'published_at': post.published_at,
+            'author': {'id': uuid.UUID(post.author.id), 'name': post.author.name,
+                       'created_at': post.author.created_at},
+            'tags': [{'id': tag.id, 'name': tag.name, 'slug': tag.slug} for tag in post.tags],
+        })
+    return {'posts': page, 'next_cursor': None, 'per_page': len(page)}
+
+
+def providers():
+    yield 'flask default', DefaultJSONProvider(Flask('default'))
+    for backend in ('stdlib', 'orjson'):
+        if backend == 'orjson' and orjson is None:
+            print('    orjson: not installed, skipped')
+            continue
+        app = Flask(backend)
+        app.config['JSON_BACKEND'] = backend
+        yield backend, JSONProvider(app)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--posts', type=int, default=100)
+    parser.add_argument('--number', type=int, default=200, help='Encodings per timing')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    init_serializers()
+    posts = build_posts(args.posts)
+    pages = {
+        'api page': {'posts': [serialize_post(post, POST_FIELDSETS['summary']) for post in posts],
+                     'next_cursor': None, 'per_page': len(posts)},
+        'native values': native_page(posts),
+    }
+
+    for page_name, page in pages.items():
+        print(f'{page_name} ({args.posts} posts):')
+        baseline = None
+        for name, provider in providers():
+            size = len(provider.dumps(page).encode('utf-8'))
+            best = min(timeit.repeat(lambda: provider.dumps(page), number=args.number, repeat=args.repeat))
+            per_page = best / args.number
+            baseline = baseline or per_page
+            print(f'  {name:>14}: {per_page * 1e6:9.1f} us/page  {size:8d} bytes  {baseline / per_page:5.1f}x')
+
+
+if __name__ == '__main__':
+    main()
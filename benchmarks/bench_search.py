@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""Time /api/v1/posts/search against a LIKE scan on a large synthetic corpus.
+
+Builds (or reuses) a SQLite database with --posts rows, then runs each query
+--repeat times through the full-text index and through LIKE '%word%' over
+title/excerpt/body. Point CONNECTION_STRING at Postgres to benchmark the
+tsvector/GIN path instead.
+
+Usage: python benchmarks/bench_search.py [--posts 100000] [--db /tmp/search-bench.db]
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+
+parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+parser.add_argument('--posts', type=int, default=100_000)
+parser.add_argument('--db', default='/tmp/search-bench.db')
+parser.add_argument('--repeat', type=int, default=20)
+args = parser.parse_args()
+
+os.environ.setdefault('CONNECTION_STRING', f'sqlite:///{args.db}')
+os.environ['RESPONSE_CACHE_ENABLED'] = 'false'
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import func, insert, or_, select  # noqa: E402
+from app import app  # noqa: E402
+from models import db, User, Post  # noqa: E402
+
+# Zipf-distributed vocabulary so terms have realistic selectivity: the query
+# words sit at ranks 50 (common), 2000 (uncommon) and 15000 (rare)
+def make_vocabulary(size=20_000):
+    rng = random.Random(7)
+    syllables = ['ka', 'lo', 'mi', 'ne', 'ru', 'sa', 'ti', 'vo', 'ze', 'ba', 'do', 'fu', 'ge', 'hi', 'ju']
+    words = set()
+    while len(words) < size:
+        words.add(''.join(rng.choice(syllables) for _ in range(rng.randint(2, 4))))
+    words = sorted(words)
+    rng.shuffle(words)
+    for rank, word in ((50, 'health'), (51, 'community'), (2000, 'malaria'), (2001, 'maternal'),
+                       (15000, 'sanitation'), (15001, 'vaccine')):
+        words[rank] = word
+    return words
+
+
+VOCABULARY = make_vocabulary()
+WEIGHTS = [1 / (rank + 1) for rank in range(len(VOCABULARY))]
+QUERIES = ['health', 'malaria', 'maternal health', 'sanitation', 'vaccine malaria']
+
+
+def sentence(rng, length):
+    return ' '.join(rng.choices(VOCABULARY, WEIGHTS, k=length))
+
+
+def build_corpus(count):
+    rng = random.Random(42)
+    author_id = str(uuid.uuid4())
+    db.session.execute(insert(User).values(
+        id=author_id, name='Bench', email=f'{author_id}@example.org', password_hash='x',
+        created_at=datetime.utcnow(), updated_at=datetime.utcnow()))
+    start = datetime.utcnow()
+    for offset in range(0, count, 5000):
+        rows = []
+        for i in range(offset, min(offset + 5000, count)):
+            created = start - timedelta(minutes=i)
+            rows.append({
+                'id': str(uuid.uuid4()), 'title': sentence(rng, 6), 'slug': f'bench-post-{i}',
+                'excerpt': sentence(rng, 20), 'body': sentence(rng, 300), 'status': 'published',
+                'author_id': author_id, 'created_at': created, 'updated_at': created, 'views': 0,
+            })
+        db.session.execute(insert(Post), rows)
+        db.session.commit()
+        print(f'  inserted {min(offset + 5000, count)} posts', end='\r')
+    print()
+
+
+def timed(fn):
+    samples = []
+    for _ in range(args.repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples), max(samples)
+
+
+def main():
+    with app.app_context():
+        db.create_all()
+        existing = db.session.execute(select(func.count(Post.id))).scalar()
+        if existing < args.posts:
+            print(f'Building corpus of {args.posts} posts in {db.engine.url}...')
+            build_corpus(args.posts - existing)
+
+        client = app.test_client()
+        print(f'{"query":<28}{"search p50":>12}{"search max":>12}{"LIKE p50":>12}{"LIKE max":>12}')
+        for q in QUERIES:
+            search = timed(lambda: client.get('/api/v1/posts/search', query_string={'q': q}))
+            word = q.split()[0]
+            pattern = f'%{word}%'
+            like = timed(lambda: db.session.execute(
+                select(Post.id)
+                .where(or_(Post.title.like(pattern), Post.excerpt.like(pattern), Post.body.like(pattern)))
+                .order_by(Post.created_at.desc()).limit(10)).all())
+            print(f'{q:<28}{search[0]:>10.2f}ms{search[1]:>10.2f}ms{like[0]:>10.2f}ms{like[1]:>10.2f}ms')
+
+
+if __name__ == '__main__':
+    main()
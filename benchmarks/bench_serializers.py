@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""Compare SerializerMixin.to_dict with the compiled serializers on 1k posts.
+
+Usage: python benchmarks/bench_serializers.py [--posts 1000] [--repeat 5]
+"""
+import argparse
+import os
+import sys
+import timeit
+import uuid
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models import User, Tag, Post  # noqa: E402
+from serializers import init_serializers, serialize_post  # noqa: E402
+
+
+def build_posts(count):
+    """Build transient posts shaped like a real listing page"""
+    now = datetime.utcnow()
+    authors = [User(id=str(uuid.uuid4()), name=f'Author {i}', email=f'author{i}@example.org',
+                    password_hash='x', bio='Bio', created_at=now, updated_at=now)
+               for i in range(20)]
+    tags = [Tag(id=i, name=f'Tag {i}', slug=f'tag-{i}') for i in range(40)]
+    posts = []
+    for i in range(count):
+        post = Post(id=str(uuid.uuid4()), title=f'Post {i}', slug=f'post-{i}', excerpt='Excerpt',
+                    body='Body ' * 200, status='published', author_id=authors[i % 20].id,
+                    created_at=now - timedelta(minutes=i), updated_at=now,
+                    published_at=now, views=i)
+        post.author = authors[i % 20]
+        post.tags = [tags[(i + k) % 40] for k in range(3)]
+        posts.append(post)
+    return posts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--posts', type=int, default=1000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    init_serializers()
+    posts = build_posts(args.posts)
+
+    results = {}
+    for name, fn in (('to_dict', lambda: [p.to_dict() for p in posts]),
+                     ('compiled', lambda: [serialize_post(p) for p in posts])):
+        results[name] = min(timeit.repeat(fn, number=1, repeat=args.repeat))
+        print(f'{name:>10}: {results[name] * 1000:8.2f} ms for {args.posts} posts')
+
+    print(f'   speedup: {results["to_dict"] / results["compiled"]:.1f}x')
+
+
+if __name__ == '__main__':
+    main()
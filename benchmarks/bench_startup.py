@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""Measure how long a fresh interpreter takes to import the app.
+
+Runs `python -X importtime -c "import app"` --runs times (what every gunicorn
+worker without preload, and every cold start, pays), and reports the wall
+time, the time spent importing `app`, the packages with the most import time
+of their own, and whether CLI-only dependencies (alembic, flask_migrate,
+commands) were kept out. With --history, each result is appended as one JSON
+line (with the git commit) so boot time can be tracked over time.
+
+Usage: python benchmarks/bench_startup.py [--runs 7] [--top 15] [--history benchmarks/startup_history.jsonl]
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from collections import Counter
+from datetime import datetime, timezone
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Only needed by `flask db` / `flask posts`; web workers should never import them
+CLI_ONLY_MODULES = ('alembic', 'flask_migrate', 'commands')
+
+PROBE = (
+    'import json, sys, time\n'
+    'start = time.perf_counter()\n'
+    'import app\n'
+    'elapsed = time.perf_counter() - start\n'
+    f'print(json.dumps({{"import_s": elapsed, "cli_only": [m for m in {CLI_ONLY_MODULES!r} if m in sys.modules]}}))\n'
+)
+
+
+def parse_importtime(stderr):
+    """Self import time (microseconds) per top-level package from -X importtime output"""
+    self_us = Counter()
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        own, _, name = line[len('import time:'):].split('|')
+        self_us[name.strip().split('.')[0]] += int(own)
+    return self_us
+
+
+def run_once(env):
+    started = time.perf_counter()
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', PROBE],
+                            cwd=ROOT, env=env, capture_output=True, text=True)
+    wall = time.perf_counter() - started
+    if result.returncode != 0:
+        sys.exit(f'Importing app failed:\n{result.stderr[-2000:]}')
+    probe = json.loads(result.stdout.strip().splitlines()[-1])
+    return wall, probe, parse_importtime(result.stderr)
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=7)
+    parser.add_argument('--top', type=int, default=15, help='Packages to list by own import time')
+    parser.add_argument('--history', help='Append the result as a JSON line to this file')
+    args = parser.parse_args()
+
+    # Importing must not need a reachable database
+    env = dict(os.environ)
+    env.setdefault('CONNECTION_STRING', 'sqlite://')
+
+    run_once(env)  # warm the OS file cache and __pycache__
+    walls, imports, totals, cli_only = [], [], Counter(), set()
+    for _ in range(args.runs):
+        wall, probe, self_us = run_once(env)
+        walls.append(wall)
+        imports.append(probe['import_s'])
+        totals.update(self_us)
+        cli_only.update(probe['cli_only'])
+
+    result = {
+        'date': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'runs': args.runs,
+        'wall_ms_median': round(statistics.median(walls) * 1000, 1),
+        'wall_ms_min': round(min(walls) * 1000, 1),
+        'import_app_ms_median': round(statistics.median(imports) * 1000, 1),
+        'cli_only_loaded': sorted(cli_only),
+        'top_packages_ms': {name: round(us / args.runs / 1000, 1)
+                            for name, us in totals.most_common(args.top)},
+    }
+
+    print(f"interpreter + import app: {result['wall_ms_median']} ms median, {result['wall_ms_min']} ms best "
+          f"({args.runs} runs)")
+    print(f"import app alone:         {result['import_app_ms_median']} ms median")
+    print(f"CLI-only modules loaded:  {', '.join(result['cli_only_loaded']) or 'none'}")
+    print('own import time by package:')
+    for name, ms in result['top_packages_ms'].items():
+        print(f'  {name:<24} {ms:8.1f} ms')
+
+    if args.history:
+        with open(args.history, 'a') as f:
+            f.write(json.dumps(result) + '\n')
+        print(f'appended to {args.history}')
+
+
+if __name__ == '__main__':
+    main()
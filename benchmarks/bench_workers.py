@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""Compare gunicorn worker classes (sync, gthread, gevent) under the same load.
+
+Tops up a database to --posts rows (see dataset.py), then for each worker class
+starts `gunicorn -c gunicorn.conf.py app:app` and drives it with a mix of list,
+slug and tag-filter requests from --concurrency keep-alive clients, reporting
+throughput and latency percentiles. The response cache is disabled so every
+request reaches the database. Worker classes whose packages are not installed
+(gevent) are skipped.
+
+Usage: python benchmarks/bench_workers.py [--posts 5000] [--classes sync,gthread,gevent]
+       [--concurrency 32] [--duration 15] [--json results.json]
+"""
+import argparse
+import importlib.util
+import json
+import os
+import signal
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+parser.add_argument('--posts', type=int, default=5000)
+parser.add_argument('--db', default='/tmp/workers-bench.db')
+parser.add_argument('--classes', default='sync,gthread,gevent')
+parser.add_argument('--workers', type=int, help='WEB_CONCURRENCY (default: gunicorn.conf.py picks from CPUs)')
+parser.add_argument('--concurrency', type=int, default=32)
+parser.add_argument('--duration', type=float, default=15.0)
+parser.add_argument('--port', type=int, default=8765)
+parser.add_argument('--json', help='Also write the results to this file')
+args = parser.parse_args()
+
+os.environ.setdefault('CONNECTION_STRING', f'sqlite:///{args.db}')
+os.environ['RESPONSE_CACHE_ENABLED'] = 'false'
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import dataset  # noqa: E402
+from loadgen import run_load, wait_until_up  # noqa: E402
+
+
+def build_corpus(count):
+    """The same synthetic corpus as bench_http.py (see dataset.py)"""
+    from app import app
+    from models import db
+    with app.app_context():
+        db.create_all()
+        print(f'Preparing {count} posts in {db.engine.url}...')
+        dataset.generate(db, count)
+        db.session.remove()
+
+
+def make_request(rng):
+    kind = rng.random()
+    if kind < 0.4:
+        return 'GET', f'/api/v1/posts?page={rng.randint(1, 50)}', None, 'list'
+    if kind < 0.8:
+        return 'GET', f'/api/v1/posts/slug/{dataset.slug_for(rng.randrange(args.posts))}', None, 'slug'
+    return 'GET', f'/api/v1/posts?tag={dataset.pick_tag(rng)}&status=published', None, 'filter'
+
+
+def available(worker_class):
+    return worker_class != 'gevent' or importlib.util.find_spec('gevent') is not None
+
+
+def bench(worker_class):
+    env = dict(os.environ, GUNICORN_WORKER_CLASS=worker_class, GUNICORN_BIND=f'127.0.0.1:{args.port}',
+               GUNICORN_ACCESS_LOG='')
+    if args.workers:
+        env['WEB_CONCURRENCY'] = str(args.workers)
+    server = subprocess.Popen([sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', 'app:app'],
+                              cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        base_url = f'http://127.0.0.1:{args.port}'
+        wait_until_up(base_url)
+        return run_load(base_url, make_request, args.concurrency, args.duration)
+    finally:
+        server.send_signal(signal.SIGTERM)
+        server.wait(timeout=60)
+
+
+def main():
+    build_corpus(args.posts)
+    results = {}
+    print(f'{"worker class":<14}{"req/s":>10}{"p50":>10}{"p99":>10}{"errors":>8}')
+    for worker_class in args.classes.split(','):
+        if not available(worker_class):
+            print(f'{worker_class:<14}  skipped (not installed)')
+            continue
+        result = results[worker_class] = bench(worker_class)
+        print(f'{worker_class:<14}{result["rps"]:>10.1f}{result["p50_ms"]:>8.1f}ms'
+              f'{result["p99_ms"]:>8.1f}ms{result["errors"]:>8}')
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'posts': args.posts, 'concurrency': args.concurrency, 'results': results}, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,113 @@
+"""Synthetic post corpus for the benchmarks.
+
+Deterministic for a given seed: post i always has slug `bench-post-{i}`, and
+topping up only adds the missing slugs, so other rows (e.g. posts created by
+a write benchmark) never count towards the corpus.
+Tag popularity and post lengths follow long-tailed distributions, like a
+real blog: a few tags are on most posts, most tags are on only a few posts.
+"""
+import random
+import uuid
+from datetime import datetime, timedelta
+from sqlalchemy import select
+
+WORDS = ('health care clinic patient doctor nurse hospital malaria vaccine child mother '
+         'water sanitation nutrition community outreach research policy training emergency '
+         'surgery maternal prenatal infection treatment prevention screening diabetes '
+         'cardiology pediatrics pharmacy laboratory volunteer funding rural access '
+         'education awareness campaign program results study report update story').split()
+
+TAG_COUNT = 300
+AUTHOR_COUNT = 50
+BATCH_SIZE = 5000
+# Share of posts carrying 0..5 tags
+TAGS_PER_POST = (0.10, 0.25, 0.30, 0.20, 0.10, 0.05)
+# Tag of popularity rank r is on posts with weight 1 / (r + 1)
+TAG_WEIGHTS = [1 / (rank + 1) for rank in range(TAG_COUNT)]
+SLUG_PREFIX = 'bench-post-'
+
+
+def slug_for(i):
+    return f'{SLUG_PREFIX}{i}'
+
+
+def tag_name(rank):
+    return f'topic-{rank}'
+
+
+def pick_tag(rng):
+    """A tag name drawn with the corpus' popularity distribution"""
+    return tag_name(rng.choices(range(TAG_COUNT), TAG_WEIGHTS)[0])
+
+
+def existing_indexes(db, count):
+    """Which of posts 0..count-1 are already in the database, by slug"""
+    from models import Post
+    found = set()
+    for slug in db.session.scalars(select(Post.slug).where(Post.slug.like(f'{SLUG_PREFIX}%'))):
+        suffix = slug[len(SLUG_PREFIX):]
+        if suffix.isdigit() and int(suffix) < count:
+            found.add(int(suffix))
+    return found
+
+
+def _text(rng, words):
+    return ' '.join(rng.choices(WORDS, k=words))
+
+
+def generate(db, count, seed=42, progress=print):
+    """Make sure posts bench-post-0..count-1 (plus authors and tags) exist, inserting the missing ones in batches"""
+    from models import User, Post, Tag, post_tags
+    from seed import insert_rows
+
+    existing = existing_indexes(db, count)
+    missing_posts = [i for i in range(count) if i not in existing]
+    if not missing_posts:
+        return count
+
+    rng = random.Random(seed + len(existing))
+    now = datetime.utcnow()
+
+    authors = list(db.session.scalars(select(User.id).where(User.email.like('bench-%@example.org'))))
+    if not authors:
+        authors = [str(uuid.uuid4()) for _ in range(AUTHOR_COUNT)]
+        insert_rows(User.__table__, [
+            {'id': author_id, 'name': f'Bench Author {n}', 'email': f'bench-{n}@example.org',
+             'password_hash': 'x', 'created_at': now, 'updated_at': now}
+            for n, author_id in enumerate(authors)])
+
+    tags = dict(db.session.execute(select(Tag.name, Tag.id).where(Tag.name.like('topic-%'))).all())
+    missing = [{'name': tag_name(rank), 'slug': tag_name(rank)} for rank in range(TAG_COUNT)
+               if tag_name(rank) not in tags]
+    if missing:
+        insert_rows(Tag.__table__, missing)
+        tags = dict(db.session.execute(select(Tag.name, Tag.id).where(Tag.name.like('topic-%'))).all())
+    tag_ids = [tags[tag_name(rank)] for rank in range(TAG_COUNT)]
+    db.session.commit()
+
+    span = timedelta(days=3 * 365)
+    for offset in range(0, len(missing_posts), BATCH_SIZE):
+        posts, links = [], []
+        for i in missing_posts[offset:offset + BATCH_SIZE]:
+            post_id = str(uuid.uuid4())
+            created = now - span * (i / max(count, 1)) - timedelta(seconds=rng.random())
+            status = rng.choices(('published', 'draft', 'archived'), (0.8, 0.15, 0.05))[0]
+            posts.append({
+                'id': post_id, 'title': _text(rng, rng.randint(4, 10)).capitalize(), 'slug': slug_for(i),
+                'excerpt': _text(rng, 25), 'body': _text(rng, int(rng.lognormvariate(6, 0.6))),
+                'status': status, 'author_id': rng.choice(authors),
+                'created_at': created, 'updated_at': created,
+                'published_at': created if status == 'published' else None,
+                'views': int(rng.paretovariate(1.2)) - 1,
+            })
+            wanted = rng.choices(range(len(TAGS_PER_POST)), TAGS_PER_POST)[0]
+            chosen = set()
+            while len(chosen) < wanted:
+                chosen.add(rng.choices(tag_ids, TAG_WEIGHTS)[0])
+            links += [{'post_id': post_id, 'tag_id': tag_id} for tag_id in chosen]
+        # COPY on Postgres, batched multi-row INSERTs elsewhere (see seed.py --bulk)
+        insert_rows(Post.__table__, posts)
+        insert_rows(post_tags, links)
+        db.session.commit()
+        progress(f'  {min(offset + BATCH_SIZE, len(missing_posts))} / {len(missing_posts)} missing posts')
+    return count
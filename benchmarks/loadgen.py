@@ -0,0 +1,125 @@
+"""Minimal closed-loop HTTP load generator shared by the benchmarks.
+
+Each of `concurrency` threads keeps one keep-alive connection open and sends
+requests back to back for `duration` seconds, picking the next request from
+`make_request(rng)`, which returns (method, path, body or None, label).
+Servers that send an X-Query-Count header also get queries per request.
+Errors are 5xx answers, failed connections, and 4xx answers to reads (a
+read benchmark hitting missing rows would otherwise time 404s).
+"""
+import http.client
+import json
+import random
+import threading
+import time
+from collections import defaultdict
+from urllib.parse import urlsplit
+
+# Methods whose 4xx answers count as errors; writes may be rejected on purpose (e.g. validation)
+READ_METHODS = ('GET', 'HEAD')
+
+
+def percentile(samples, p):
+    """p-th percentile (0-100) of `samples` by nearest rank"""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = max(0, min(len(ordered) - 1, int(round(p / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+
+def summarize(samples, errors, elapsed, queries=()):
+    """Throughput and latency percentiles (ms) for one set of samples (seconds)"""
+    result = {
+        'requests': len(samples),
+        'errors': errors,
+        'rps': round(len(samples) / elapsed, 1) if elapsed else 0.0,
+        'p50_ms': round(percentile(samples, 50) * 1000, 2),
+        'p90_ms': round(percentile(samples, 90) * 1000, 2),
+        'p99_ms': round(percentile(samples, 99) * 1000, 2),
+        'max_ms': round(max(samples, default=0) * 1000, 2),
+    }
+    if queries:
+        result['queries_per_request'] = round(sum(queries) / len(queries), 2)
+        result['max_queries'] = max(queries)
+    return result
+
+
+def wait_until_up(base_url, path='/api/v1/health', timeout=30):
+    """Poll `path` until the server answers, or raise after `timeout` seconds"""
+    parts = urlsplit(base_url)
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            connection = http.client.HTTPConnection(parts.hostname, parts.port, timeout=2)
+            connection.request('GET', path)
+            if connection.getresponse().status < 500:
+                return
+        except OSError:
+            pass
+        if time.monotonic() > deadline:
+            raise RuntimeError(f'{base_url} did not come up within {timeout}s')
+        time.sleep(0.2)
+
+
+def run_load(base_url, make_request, concurrency=16, duration=10.0, warmup=1.0, seed=0):
+    """Drive the server and return overall and per-label summaries"""
+    parts = urlsplit(base_url)
+    samples = defaultdict(list)
+    errors = defaultdict(int)
+    queries = defaultdict(list)
+    lock = threading.Lock()
+    start = time.monotonic()
+    measure_from = start + warmup
+    stop_at = measure_from + duration
+
+    def worker(index):
+        rng = random.Random(seed * 1000 + index)
+        connection = http.client.HTTPConnection(parts.hostname, parts.port, timeout=30)
+        local_samples, local_errors, local_queries = defaultdict(list), defaultdict(int), defaultdict(list)
+        while True:
+            now = time.monotonic()
+            if now >= stop_at:
+                break
+            method, path, body, label = make_request(rng)
+            headers = {'Content-Type': 'application/json'} if body is not None else {}
+            began = time.perf_counter()
+            query_count = None
+            try:
+                connection.request(method, path, json.dumps(body) if body is not None else None, headers)
+                response = connection.getresponse()
+                response.read()
+                failed = response.status >= 500 or (response.status >= 400 and method in READ_METHODS)
+                query_count = response.getheader('X-Query-Count')
+            except (OSError, http.client.HTTPException):
+                connection.close()
+                connection = http.client.HTTPConnection(parts.hostname, parts.port, timeout=30)
+                failed = True
+            took = time.perf_counter() - began
+            if now >= measure_from:
+                if failed:
+                    local_errors[label] += 1
+                else:
+                    local_samples[label].append(took)
+                    if query_count is not None:
+                        local_queries[label].append(int(query_count))
+        with lock:
+            for label, values in local_samples.items():
+                samples[label].extend(values)
+            for label, count in local_errors.items():
+                errors[label] += count
+            for label, values in local_queries.items():
+                queries[label].extend(values)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    every = [sample for values in samples.values() for sample in values]
+    result = summarize(every, sum(errors.values()), duration,
+                       [count for values in queries.values() for count in values])
+    result['routes'] = {label: summarize(samples[label], errors[label], duration, queries[label])
+                        for label in sorted(set(samples) | set(errors))}
+    return result
@@ -0,0 +1,279 @@
+# cache.py
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from flask import current_app, g, request
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from conditional import is_not_modified, not_modified
+from invalidation_bus import create_bus, CLEAR_ALL
+from replicas import replica_router
+from extensions import extension, extension_proxy
+
+# Headers replayed from a cached response
+CACHED_HEADERS = ('Content-Type', 'ETag', 'Last-Modified')
+
+# Dependency tag shared by every collection (list) response
+COLLECTION = 'posts'
+
+
+class CacheEntry:
+    __slots__ = ('key', 'body', 'headers', 'etag', 'last_modified', 'dependencies', 'expires', 'size', 'variants')
+
+    def __init__(self, response, dependencies, ttl):
+        self.body = response.get_data()
+        self.headers = [(name, response.headers[name]) for name in CACHED_HEADERS if name in response.headers]
+        self.etag = response.get_etag()[0]
+        self.last_modified = response.last_modified
+        self.dependencies = frozenset(dependencies)
+        self.expires = time.monotonic() + ttl
+        self.size = len(self.body) + sum(len(name) + len(value) for name, value in self.headers)
+        self.key = None
+        # Compressed bodies by Content-Encoding, filled in on first use
+        self.variants = {}
+
+
+class ResponseCache:
+    """
+    Bounded LRU + TTL cache of serialized GET responses.
+
+    Every entry is tagged with the rows it was built from ('post:<id>',
+    'tag:<id>', 'user:<id>', or 'posts' for collections) so writes can drop
+    exactly the entries they affect.
+    """
+
+    def __init__(self, max_bytes=32 * 1024 * 1024, ttl=60, enabled=True):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.enabled = enabled
+        self._entries = OrderedDict()
+        self._keys_by_dependency = {}
+        self._lock = threading.Lock()
+        self._size = 0
+        # Bumped on every invalidation; responses computed across a bump are not stored
+        self.generation = 0
+        # When the last invalidation happened (time.monotonic())
+        self.invalidated_at = float('-inf')
+        self.hits = self.misses = self.evictions = self.invalidations = 0
+        # Cross-worker invalidation channel (see invalidation_bus.py), if configured
+        self.bus = None
+        self.remote_invalidations = 0
+
+    def init_app(self, app):
+        app.extensions['response_cache'] = self
+        self.max_bytes = int(app.config.get('RESPONSE_CACHE_MAX_BYTES', self.max_bytes))
+        self.ttl = float(app.config.get('RESPONSE_CACHE_TTL', self.ttl))
+        self.enabled = bool(app.config.get('RESPONSE_CACHE_ENABLED', self.enabled))
+        if self.enabled:
+            self.bus = create_bus(app, self._apply_remote, on_reconnect=self.clear)
+
+    def _apply_remote(self, dependencies):
+        """Apply an invalidation published by another worker"""
+        self.remote_invalidations += 1
+        if CLEAR_ALL in dependencies:
+            self.clear()
+        else:
+            self.invalidate(*dependencies)
+
+    def broadcast(self, dependencies):
+        """Publish committed invalidations to the other workers"""
+        if self.bus is not None:
+            self.bus.publish(dependencies)
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires < time.monotonic():
+                self._remove(key)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def set(self, key, entry, generation):
+        if entry.size > self.max_bytes:
+            return
+        with self._lock:
+            if generation != self.generation:
+                return
+            if key in self._entries:
+                self._remove(key)
+            entry.key = key
+            self._entries[key] = entry
+            self._size += entry.size
+            for dependency in entry.dependencies:
+                self._keys_by_dependency.setdefault(dependency, set()).add(key)
+            while self._size > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def variant(self, entry, encoding, compress):
+        """`entry`'s body compressed with `encoding`; each entry compresses it only once"""
+        data = entry.variants.get(encoding)
+        if data is not None:
+            return data
+        data = compress(entry.body, encoding)
+        with self._lock:
+            if encoding in entry.variants:
+                return entry.variants[encoding]
+            entry.variants[encoding] = data
+            entry.size += len(data)
+            if self._entries.get(entry.key) is entry:
+                self._size += len(data)
+                while self._size > self.max_bytes:
+                    self._remove(next(iter(self._entries)))
+                    self.evictions += 1
+        return data
+
+    def invalidate(self, *dependencies):
+        with self._lock:
+            self.generation += 1
+            self.invalidated_at = time.monotonic()
+            for dependency in dependencies:
+                for key in self._keys_by_dependency.pop(dependency, ()):
+                    if key in self._entries:
+                        self._remove(key)
+                        self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self.generation += 1
+            self.invalidated_at = time.monotonic()
+            self.invalidations += len(self._entries)
+            self._entries.clear()
+            self._keys_by_dependency.clear()
+            self._size = 0
+
+    def _remove(self, key):
+        entry = self._entries.pop(key)
+        self._size -= entry.size
+        for dependency in entry.dependencies:
+            keys = self._keys_by_dependency.get(dependency)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._keys_by_dependency[dependency]
+
+    def stats(self):
+        with self._lock:
+            return {
+                'enabled': self.enabled,
+                'entries': len(self._entries),
+                'size_bytes': self._size,
+                'max_bytes': self.max_bytes,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations,
+                'remote_invalidations': self.remote_invalidations,
+                'bus': type(self.bus).__name__ if self.bus is not None else None,
+            }
+
+
+response_cache = extension_proxy('response_cache')
+
+
+def cache_depends_on(*dependencies):
+    """Record what the response being built depends on (no-op outside cached views)"""
+    pending = g.get('cache_dependencies')
+    if pending is not None:
+        pending.update(dependencies)
+
+
+def caching_response():
+    """Whether the response being built is offered to the cache (so its dependencies are worth computing)"""
+    return g.get('cache_dependencies') is not None
+
+
+def cached_response(view):
+    """Serve GET responses from `response_cache`, keyed by route and normalized args"""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        # Clients reading their own writes skip the cache, which may hold replica-fed responses
+        if not response_cache.enabled or replica_router.pinned():
+            return view(*args, **kwargs)
+        if response_cache.bus is not None:
+            response_cache.bus.ensure_running()
+
+        key = (request.endpoint, tuple(sorted(kwargs.items())),
+               tuple(sorted(request.args.items(multi=True))))
+        entry = response_cache.get(key)
+        if entry is not None:
+            # Responses without an ETag (e.g. search) cannot answer If-None-Match: * with a 304
+            if entry.etag is not None and is_not_modified(entry.etag, entry.last_modified):
+                return not_modified(entry.etag, entry.last_modified)
+            # Lets compression reuse (or store) the entry's compressed bodies
+            g.cache_entry = entry
+            return current_app.response_class(entry.body, status=200, headers=entry.headers)
+
+        generation = response_cache.generation
+        g.cache_dependencies = set()
+        response = view(*args, **kwargs)
+        if getattr(response, 'status_code', None) == 200 and not response.is_streamed and not _may_be_stale():
+            g.cache_entry = CacheEntry(response, g.cache_dependencies, response_cache.ttl)
+            response_cache.set(key, g.cache_entry, generation)
+        return response
+    return wrapper
+
+
+def _may_be_stale():
+    """Whether the response was read from a replica that may not have replayed the last write yet"""
+    return (g.get('replica_read', False)
+            and time.monotonic() - response_cache.invalidated_at < replica_router.lag_window)
+
+
+_PENDING_KEY = 'response_cache_pending'
+
+
+def invalidate_on_commit(session, *dependencies):
+    """
+    Drop cached responses for `dependencies` now and again once the session
+    commits, so readers that saw pre-commit data cannot re-cache it.
+    """
+    cache = extension('response_cache')
+    if cache is not None:
+        cache.invalidate(*dependencies)
+    if session is not None:
+        session.info.setdefault(_PENDING_KEY, set()).update(dependencies)
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_committed(session):
+    invalidate_committed(session.info.pop(_PENDING_KEY, None))
+
+
+def invalidate_committed(dependencies):
+    """Drop cached responses for committed changes to `dependencies`, here and in the other workers"""
+    cache = extension('response_cache')
+    if not dependencies or cache is None:
+        return
+    if CLEAR_ALL in dependencies:
+        cache.clear()
+        cache.broadcast([CLEAR_ALL])
+    else:
+        cache.invalidate(*dependencies)
+        cache.broadcast(dependencies)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_pending(session):
+    session.info.pop(_PENDING_KEY, None)
+
+
+@event.listens_for(Session, 'do_orm_execute')
+def _invalidate_bulk_writes(orm_execute_state):
+    # Bulk/Core DML through the session skips the mapper events; drop everything it may touch.
+    # New tags and users are not part of any response until a post references them.
+    state = orm_execute_state
+    if state.is_update or state.is_delete or state.is_insert:
+        table = getattr(getattr(state.statement, 'table', None), 'name', None)
+        if table in ('posts', 'post_tags') or (table in ('tags', 'users') and not state.is_insert):
+            cache = extension('response_cache')
+            if cache is not None:
+                cache.clear()
+            state.session.info.setdefault(_PENDING_KEY, set()).add(CLEAR_ALL)
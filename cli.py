@@ -0,0 +1,36 @@
+# cli.py
+import importlib
+import click
+
+
+class LazyGroup(click.Group):
+    """
+    Click group standing in for the group at `import_path` ('module:attribute'),
+    which is imported (and `setup` called) only when one of its commands is
+    listed or run.
+    """
+
+    def __init__(self, name, import_path, setup=None, **kwargs):
+        super().__init__(name, **kwargs)
+        self.import_path = import_path
+        self.setup = setup
+        self._group = None
+
+    def _load(self):
+        if self._group is None:
+            module_name, attribute = self.import_path.split(':')
+            group = getattr(importlib.import_module(module_name), attribute)
+            if self.setup is not None:
+                self.setup()
+            self._group = group
+        return self._group
+
+    def make_context(self, info_name, args, parent=None, **extra):
+        # The loaded group parses its own options and runs its own callback
+        return self._load().make_context(info_name, args, parent=parent, **extra)
+
+    def list_commands(self, ctx):
+        return self._load().list_commands(ctx)
+
+    def get_command(self, ctx, name):
+        return self._load().get_command(ctx, name)
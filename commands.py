@@ -0,0 +1,145 @@
+# commands.py
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+import click
+from flask.cli import AppGroup
+from sqlalchemy import bindparam, or_, select, tuple_, update
+from models import db, Post
+from markdown_render import render_with_digest
+from query_plans import explain, scans_and_sorts
+
+posts_cli = AppGroup('posts', help='Post maintenance commands.')
+
+
+@posts_cli.command('backfill-html')
+@click.option('--batch-size', default=500, show_default=True, help='Rows rendered and written per batch.')
+@click.option('--workers', default=os.cpu_count() or 1, show_default=True, help='Rendering processes.')
+@click.option('--force', is_flag=True, help='Re-render every post, not just missing or stale ones.')
+def backfill_html(batch_size, workers, force):
+    """Render body_html for existing posts in parallel batches."""
+    query = select(Post.id, Post.body, Post.body_hash).order_by(Post.id).limit(batch_size)
+    if not force:
+        query = query.where(or_(Post.body_html.is_(None), Post.body_hash.is_(None)))
+
+    # Core UPDATE so the backfill does not bump updated_at through the ORM listener
+    stmt = (update(Post.__table__)
+            .where(Post.__table__.c.id == bindparam('post_id'))
+            .values(body_html=bindparam('html'), body_hash=bindparam('digest')))
+
+    rendered = 0
+    last_id = None
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        while True:
+            batch = query if last_id is None else query.where(Post.id > last_id)
+            rows = db.session.execute(batch).all()
+            if not rows:
+                break
+            last_id = rows[-1].id
+
+            results = pool.map(render_with_digest, [row.body for row in rows],
+                               chunksize=max(1, len(rows) // (workers * 4)))
+            params = [{'post_id': row.id, 'html': html, 'digest': digest}
+                      for row, (html, digest) in zip(rows, results)]
+            db.session.execute(stmt, params)
+            db.session.commit()
+
+            rendered += len(params)
+            click.echo(f'Rendered {rendered} posts...')
+
+    click.echo(f'Done: {rendered} posts rendered.')
+
+
+# Filter combinations accepted by GET /api/v1/posts
+LISTING_FILTERS = [
+    {},
+    {'status': 'published'},
+    {'author_id': 'author'},
+    {'tag': 'tag'},
+    {'status': 'published', 'author_id': 'author'},
+    {'status': 'published', 'tag': 'tag'},
+    {'tags': 'tag,other', 'match': 'all'},
+    {'tags': 'tag,other', 'match': 'any'},
+    {'status': 'published', 'tags': 'tag,other', 'match': 'all'},
+]
+
+
+# Pagination styles of GET /api/v1/posts
+LISTING_MODES = ('offset', 'cursor')
+
+
+def filter_label(filters):
+    return ' '.join(f'{key}={value}' for key, value in filters.items()) or 'no filter'
+
+
+def listing_statement(filters, mode):
+    """The SELECT GET /api/v1/posts runs for `filters` in pagination `mode` (needs an app context)"""
+    from resources.blogs_resource import filtered_posts_query
+    from serializers import POST_FIELDSETS
+
+    query = (filtered_posts_query(filters, POST_FIELDSETS['summary'])
+             .order_by(Post.created_at.desc(), Post.id.desc()))
+    if mode == 'offset':
+        return query.limit(10).offset(100).statement
+    return query.filter(tuple_(Post.created_at, Post.id) < tuple_(datetime.utcnow(), '')).limit(11).statement
+
+
+def listing_plan(connection, filters, mode):
+    """EXPLAIN lines for a listing query; on Postgres, whether an index *could* serve it"""
+    if connection.dialect.name == 'postgresql':
+        # Small or empty tables make seq scans look cheap
+        connection.exec_driver_sql('SET LOCAL enable_seqscan = off')
+    return explain(connection, listing_statement(filters, mode))
+
+
+@posts_cli.command('check-plans')
+@click.option('--verbose', is_flag=True, help='Print every plan, not just failing ones.')
+def check_plans(verbose):
+    """EXPLAIN each listing query against this database; fail if one scans posts and sorts.
+
+    tests/test_query_plans.py makes the same assertions against a fresh schema.
+    """
+    connection = db.session.connection()
+    failures = 0
+    for filters in LISTING_FILTERS:
+        for mode in LISTING_MODES:
+            plan = listing_plan(connection, filters, mode)
+            bad = scans_and_sorts(plan, connection.dialect.name)
+            failures += bad
+            click.echo(f"{'FAIL' if bad else 'ok'}\t{mode}\t{filter_label(filters)}")
+            if bad or verbose:
+                for line in plan:
+                    click.echo(f'\t\t{line}')
+
+    db.session.rollback()
+    if failures:
+        raise click.ClickException(f'{failures} listing queries fall back to a sequential scan plus sort')
+
+
+@posts_cli.command('export')
+@click.option('--output', 'output_format', type=click.Choice(['ndjson', 'csv']), default='ndjson', show_default=True)
+@click.option('--file', 'path', type=click.Path(dir_okay=False, writable=True, allow_dash=True), default='-',
+              show_default=True, help='Where to write the export.')
+@click.option('--status', help='Only posts with this status.')
+@click.option('--author-id', help='Only posts by this author.')
+@click.option('--tag', 'tags', multiple=True, help='Only posts with this tag (repeatable).')
+@click.option('--match', type=click.Choice(['all', 'any']), default='all', show_default=True,
+              help='Whether posts need all or any of the --tag values.')
+@click.option('--fields', default='full', show_default=True, help='Fieldset name or comma separated fields.')
+@click.option('--batch-size', default=1000, show_default=True, help='Rows fetched per server-side cursor batch.')
+def export(output_format, path, status, author_id, tags, match, fields, batch_size):
+    """Stream all (or the filtered) posts to a file as NDJSON or CSV."""
+    from export import export_posts, export_query
+    from serializers import parse_fields
+
+    try:
+        fields = parse_fields(Post, fields, 'full')
+        query = export_query({'status': status, 'author_id': author_id,
+                             'tags': ','.join(tags), 'match': match}, fields)
+    except ValueError as e:
+        raise click.BadParameter(str(e))
+
+    with click.open_file(path, 'w', encoding='utf-8') as out:
+        for chunk in export_posts(query, fields, output_format, batch_size):
+            out.write(chunk)
+    db.session.rollback()
@@ -0,0 +1,118 @@
+# compression.py
+import gzip
+from flask import g, request
+from extensions import extension_proxy
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Every Content-Encoding this module can produce (also used to match ETag variants)
+ENCODINGS = ('br', 'zstd', 'gzip')
+
+# Response types worth compressing
+COMPRESSIBLE_TYPES = ('application/json', 'application/x-ndjson', 'text/')
+
+
+def _compressors(levels):
+    compressors = {'gzip': lambda data: gzip.compress(data, compresslevel=levels['gzip'], mtime=0)}
+    if brotli is not None:
+        compressors['br'] = lambda data: brotli.compress(data, quality=levels['br'])
+    if zstandard is not None:
+        # Compressor objects are not thread-safe; they are cheap enough to make per call
+        compressors['zstd'] = lambda data: zstandard.ZstdCompressor(level=levels['zstd']).compress(data)
+    return compressors
+
+
+def variant_etag(etag, encoding):
+    """Strong ETag of the `encoding`-compressed representation"""
+    return f'{etag}-{encoding}'
+
+
+class Compression:
+    """
+    Negotiates gzip/br/zstd from Accept-Encoding and compresses API
+    responses of at least `min_size` bytes. Brotli and zstd are used only
+    when their packages (brotli, zstandard) are installed.
+    """
+
+    def __init__(self, enabled=True, min_size=1024, preference=ENCODINGS, levels=None):
+        self.enabled = enabled
+        self.min_size = min_size
+        self.levels = dict({'gzip': 6, 'br': 5, 'zstd': 3}, **(levels or {}))
+        self._compressors = _compressors(self.levels)
+        self.preference = [encoding for encoding in preference if encoding in self._compressors]
+
+    def init_app(self, app):
+        app.extensions['compression'] = self
+        self.enabled = bool(app.config.get('COMPRESS_ENABLED', self.enabled))
+        self.min_size = int(app.config.get('COMPRESS_MIN_SIZE', self.min_size))
+        preference = app.config.get('COMPRESS_ENCODINGS') or ','.join(self.preference)
+        self.preference = [encoding.strip() for encoding in preference.split(',')
+                           if encoding.strip() in self._compressors]
+        if self.enabled:
+            app.after_request(self._after_request)
+
+    def compress(self, data, encoding):
+        return self._compressors[encoding](data)
+
+    def negotiate(self):
+        """Best encoding the client accepts, or None"""
+        if not self.enabled or not self.preference:
+            return None
+        return request.accept_encodings.best_match(self.preference)
+
+    def applies_to(self, response):
+        return (response.status_code == 200
+                and not response.direct_passthrough
+                and not response.is_streamed
+                and 'Content-Encoding' not in response.headers
+                and (response.mimetype or '').startswith(COMPRESSIBLE_TYPES))
+
+    def encode_response(self, response, body, encoding):
+        """Put the `encoding`-compressed `body` into `response` with matching headers"""
+        etag, weak = response.get_etag()
+        response.set_data(body)
+        response.headers['Content-Encoding'] = encoding
+        if etag:
+            response.set_etag(variant_etag(etag, encoding), weak)
+        return response
+
+    def _after_request(self, response):
+        if response.status_code == 304:
+            return self._match_not_modified(response)
+        if not self.applies_to(response):
+            return response
+        response.vary.add('Accept-Encoding')
+        if response.content_length is not None and response.content_length < self.min_size:
+            return response
+        encoding = self.negotiate()
+        if encoding is None:
+            return response
+
+        # A response just stored in the cache keeps its compressed form there too
+        entry = g.get('cache_entry')
+        if entry is not None:
+            from cache import response_cache
+            body = response_cache.variant(entry, encoding, self.compress)
+        else:
+            body = self.compress(response.get_data(), encoding)
+        return self.encode_response(response, body, encoding)
+
+    def _match_not_modified(self, response):
+        # Revalidations of a compressed variant must get that variant's ETag back
+        etag, weak = response.get_etag()
+        encoding = self.negotiate() if etag else None
+        if encoding and request.if_none_match.contains_weak(variant_etag(etag, encoding)):
+            response.set_etag(variant_etag(etag, encoding), weak)
+            response.vary.add('Accept-Encoding')
+        return response
+
+
+compression = extension_proxy('compression')
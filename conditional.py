@@ -0,0 +1,41 @@
+# conditional.py
+import hashlib
+from datetime import timezone
+from flask import request, make_response
+from compression import ENCODINGS, variant_etag
+
+
+def make_etag(*parts):
+    """Strong ETag over the validator values plus the normalized query string"""
+    args = sorted(request.args.items(multi=True))
+    raw = '|'.join(str(part) for part in parts + (args,))
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+
+def _as_utc(value):
+    return value.replace(tzinfo=timezone.utc, microsecond=0) if value is not None else None
+
+
+def is_not_modified(etag, last_modified=None):
+    """Evaluate If-None-Match (which wins when present) and If-Modified-Since"""
+    if request.if_none_match:
+        # Compressed representations carry the same ETag plus an encoding suffix
+        return any(request.if_none_match.contains_weak(candidate)
+                   for candidate in (etag, *(variant_etag(etag, encoding) for encoding in ENCODINGS)))
+    if last_modified is not None and request.if_modified_since:
+        return _as_utc(last_modified) <= request.if_modified_since
+    return False
+
+
+def with_validators(response, etag, last_modified=None):
+    """Attach ETag/Last-Modified (when set) to a response"""
+    if etag is not None:
+        response.set_etag(etag)
+    if last_modified is not None:
+        response.last_modified = _as_utc(last_modified)
+    return response
+
+
+def not_modified(etag, last_modified=None):
+    """Empty 304 response carrying the current validators"""
+    return with_validators(make_response('', 304), etag, last_modified)
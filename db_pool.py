@@ -0,0 +1,136 @@
+# db_pool.py
+import threading
+import time
+from sqlalchemy import text
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeout
+from sqlalchemy.pool import NullPool, QueuePool
+
+POOL_MODES = ('queue', 'null')
+
+
+class PoolMetrics:
+    """Checkout counters for one engine's pool (kept across pool re-creation)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.waits = 0
+        self.timeouts = 0
+        self.errors = 0
+        self.checkout_seconds = 0.0
+        self.max_checkout_seconds = 0.0
+
+    def record(self, seconds, waited, failure=None):
+        with self._lock:
+            if failure is None:
+                self.checkouts += 1
+            elif failure == 'timeout':
+                self.timeouts += 1
+            else:
+                self.errors += 1
+            self.waits += waited
+            self.checkout_seconds += seconds
+            self.max_checkout_seconds = max(self.max_checkout_seconds, seconds)
+
+    def snapshot(self):
+        with self._lock:
+            attempts = self.checkouts + self.timeouts + self.errors
+            return {
+                'checkouts': self.checkouts,
+                'waits': self.waits,
+                'timeouts': self.timeouts,
+                'errors': self.errors,
+                'avg_checkout_ms': round(self.checkout_seconds * 1000 / attempts, 3) if attempts else 0.0,
+                'max_checkout_ms': round(self.max_checkout_seconds * 1000, 3),
+            }
+
+
+class MeteredPool:
+    """Mixin timing every checkout, including the wait for a free connection"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+
+    def _exhausted(self):
+        return False
+
+    def _do_get(self):
+        waited = self._exhausted()
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeout:
+            self.metrics.record(time.perf_counter() - start, waited, 'timeout')
+            raise
+        except Exception:
+            self.metrics.record(time.perf_counter() - start, waited, 'error')
+            raise
+        self.metrics.record(time.perf_counter() - start, waited)
+        return connection
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+
+class MeteredQueuePool(MeteredPool, QueuePool):
+    def _exhausted(self):
+        # No idle connection and no room to open an overflow one: the checkout has to wait
+        return self.checkedin() == 0 and -1 < self._max_overflow <= self.overflow()
+
+
+class MeteredNullPool(MeteredPool, NullPool):
+    """No pooling: every checkout opens a new connection (for PgBouncer in transaction mode)"""
+
+
+def engine_options(config):
+    """SQLALCHEMY_ENGINE_OPTIONS for the DB_POOL_* settings in `config`"""
+    uri = config.get('SQLALCHEMY_DATABASE_URI')
+    if not uri or make_url(uri).get_backend_name() == 'sqlite':
+        # SQLite picks its own pool (one connection per thread for :memory:); leave it be
+        return {}
+
+    mode = (config.get('DB_POOL_MODE') or 'queue').lower()
+    if mode not in POOL_MODES:
+        raise ValueError(f"Unknown DB_POOL_MODE '{mode}'")
+    if mode == 'null':
+        # PgBouncer owns the pooling; connections are handed back after every transaction
+        return {'poolclass': MeteredNullPool}
+    return {
+        'poolclass': MeteredQueuePool,
+        'pool_size': int(config.get('DB_POOL_SIZE', 5)),
+        'max_overflow': int(config.get('DB_MAX_OVERFLOW', 10)),
+        'pool_timeout': float(config.get('DB_POOL_TIMEOUT', 30)),
+        'pool_recycle': int(config.get('DB_POOL_RECYCLE', 1800)),
+        'pool_pre_ping': bool(config.get('DB_POOL_PRE_PING', True)),
+    }
+
+
+def pool_stats(engine):
+    """Current occupancy and checkout counters for `engine`'s pool"""
+    pool = engine.pool
+    stats = {'pool': type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        stats.update({
+            'size': pool.size(),
+            'checked_out': pool.checkedout(),
+            'checked_in': pool.checkedin(),
+            'overflow': max(pool.overflow(), 0),
+            'max_overflow': pool._max_overflow,
+            'timeout': pool.timeout(),
+        })
+    metrics = getattr(pool, 'metrics', None)
+    if metrics is not None:
+        stats.update(metrics.snapshot())
+    return stats
+
+
+def ping(engine):
+    """Round-trip time of SELECT 1 in milliseconds"""
+    start = time.perf_counter()
+    with engine.connect() as connection:
+        connection.execute(text('SELECT 1'))
+    return round((time.perf_counter() - start) * 1000, 3)
@@ -0,0 +1,80 @@
+# export.py
+import csv
+import io
+from itertools import islice
+from flask import current_app
+from sqlalchemy import select
+from sqlalchemy.orm.attributes import set_committed_value
+from models import db, Post, Tag, post_tags
+from serializers import serialize_post
+from resources.blogs_resource import filtered_posts_query
+
+EXPORT_FORMATS = {'ndjson': 'application/x-ndjson', 'csv': 'text/csv'}
+
+
+def load_tags(posts):
+    """Fill in the tags of `posts` with a single IN query"""
+    by_post = {post.id: [] for post in posts}
+    rows = db.session.execute(
+        select(post_tags.c.post_id, Tag)
+        .join(Tag, Tag.id == post_tags.c.tag_id)
+        .where(post_tags.c.post_id.in_(by_post))
+        .order_by(Tag.name))
+    for post_id, tag in rows:
+        by_post[post_id].append(tag)
+    for post in posts:
+        set_committed_value(post, 'tags', by_post[post.id])
+
+
+def export_query(args, fields):
+    """
+    Posts query for the list filters in `args`. Tags are left out of the
+    eager loads: selectinload cannot be combined with yield_per, so
+    post_batches loads them itself.
+    """
+    return filtered_posts_query(args, tuple(field for field in fields if field != 'tags'))
+
+
+def post_batches(query, batch_size=1000, with_tags=False):
+    """
+    Yield lists of posts from `query`, newest first, read through a
+    server-side cursor `batch_size` rows at a time so memory stays flat.
+    """
+    posts = iter(query.order_by(Post.created_at.desc(), Post.id.desc()).yield_per(batch_size))
+    while True:
+        batch = list(islice(posts, batch_size))
+        if not batch:
+            return
+        if with_tags:
+            load_tags(batch)
+        yield batch
+
+
+def _csv_value(key, value):
+    # Flatten embedded relations to something a spreadsheet can hold
+    if key == 'author':
+        return value['name'] if value else ''
+    if key == 'tags':
+        return ','.join(tag['name'] for tag in value)
+    return '' if value is None else value
+
+
+def export_posts(query, fields, export_format='ndjson', batch_size=1000):
+    """Yield `query`'s posts as chunks of NDJSON or CSV text, one chunk per batch"""
+    if export_format == 'csv':
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(fields)
+        for batch in post_batches(query, batch_size, 'tags' in fields):
+            for post in batch:
+                data = serialize_post(post, fields)
+                writer.writerow([_csv_value(key, data[key]) for key in fields])
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue()
+    else:
+        dumps = current_app.json.dumps
+        for batch in post_batches(query, batch_size, 'tags' in fields):
+            yield ''.join(dumps(serialize_post(post, fields)) + '\n' for post in batch)
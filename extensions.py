@@ -0,0 +1,16 @@
+# extensions.py
+from flask import current_app, has_app_context
+from werkzeug.local import LocalProxy
+
+
+def extension(name):
+    """The current app's `name` extension, or None outside an app context"""
+    return current_app.extensions.get(name) if has_app_context() else None
+
+
+def extension_proxy(name):
+    """
+    Module-level stand-in for the current app's `name` extension: every app
+    from create_app() has its own instances, stored in app.extensions.
+    """
+    return LocalProxy(lambda: current_app.extensions[name])
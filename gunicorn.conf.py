@@ -0,0 +1,90 @@
+# gunicorn.conf.py
+# Usage: gunicorn -c gunicorn.conf.py app:app
+#
+# GUNICORN_WORKER_CLASS picks the concurrency model:
+#   gthread (default) - WEB_CONCURRENCY processes x GUNICORN_THREADS threads
+#   gevent            - WEB_CONCURRENCY processes x GUNICORN_WORKER_CONNECTIONS greenlets
+#                       (needs `pip install gevent psycogreen`)
+#   sync              - one request at a time per process
+# Keep DB_POOL_SIZE + DB_MAX_OVERFLOW at or above the per-process concurrency
+# (threads for gthread); with gevent prefer DB_POOL_MODE=null behind PgBouncer.
+#
+# Every worker keeps its own response cache (on by default), so a write must
+# reach the others: CACHE_BUS defaults to "local" (Unix sockets in
+# CACHE_BUS_DIR, all workers on this host). Running several hosts needs
+# CACHE_BUS=postgres; CACHE_BUS=none serves stale responses from the other
+# workers for up to RESPONSE_CACHE_TTL unless RESPONSE_CACHE_ENABLED=false.
+import gc
+import multiprocessing
+import os
+import sys
+
+cpus = multiprocessing.cpu_count()
+
+worker_class = os.getenv("GUNICORN_WORKER_CLASS", "gthread")
+
+# Threads and greenlets spend most of their time waiting on Postgres, so fewer
+# processes are needed than with sync workers
+default_workers = cpus * 2 + 1 if worker_class == "sync" else cpus + 1
+workers = int(os.getenv("WEB_CONCURRENCY", default_workers))
+threads = int(os.getenv("GUNICORN_THREADS", 4 if worker_class == "gthread" else 1))
+worker_connections = int(os.getenv("GUNICORN_WORKER_CONNECTIONS", 100))
+
+bind = os.getenv("GUNICORN_BIND", f"0.0.0.0:{os.getenv('PORT', '8000')}")
+preload_app = os.getenv("GUNICORN_PRELOAD", "true").lower() == "true"
+timeout = int(os.getenv("GUNICORN_TIMEOUT", 30))
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", 30))
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", 5))
+
+# Recycle workers now and then so slow leaks cannot accumulate
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", 0))
+max_requests_jitter = int(os.getenv("GUNICORN_MAX_REQUESTS_JITTER", 0))
+
+accesslog = os.getenv("GUNICORN_ACCESS_LOG", "-") or None
+
+
+def _flask_app():
+    """The app module's Flask app if it is already imported (always the case with preload)"""
+    module = sys.modules.get("app")
+    return getattr(module, "app", None)
+
+
+def when_ready(server):
+    # The preloaded app (mappers configured, serializers compiled by create_app)
+    # is shared copy-on-write; keep the workers' GC from touching those pages
+    if preload_app:
+        gc.freeze()
+
+
+def post_fork(server, worker):
+    # Pooled connections opened in the master while preloading must never be
+    # shared with a child; drop them without closing the parent's sockets
+    app = _flask_app()
+    if app is None:
+        return
+    from models import db
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=False)
+
+
+def post_worker_init(worker):
+    # gevent is patched in during worker init; make psycopg2 cooperative too
+    if worker_class == "gevent":
+        try:
+            from psycogreen.gevent import patch_psycopg
+        except ImportError:
+            worker.log.warning("psycogreen is not installed; Postgres queries will block the gevent worker")
+        else:
+            patch_psycopg()
+
+
+def worker_exit(server, worker):
+    # Write buffered view counts before the process goes away
+    app = _flask_app()
+    if app is None:
+        return
+    try:
+        app.extensions['view_counter'].flush()
+    except Exception:
+        worker.log.exception("Could not flush post view counts on exit")
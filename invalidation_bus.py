@@ -0,0 +1,232 @@
+# invalidation_bus.py
+import atexit
+import json
+import logging
+import os
+import select
+import socket
+import tempfile
+import threading
+import time
+import uuid
+import weakref
+
+logger = logging.getLogger(__name__)
+
+# Sent instead of a dependency list when it would not fit in one message
+CLEAR_ALL = '*'
+
+# Buses with a listener thread in this process; one exit hook stops them all
+_running = weakref.WeakSet()
+
+
+@atexit.register
+def _stop_all():
+    for bus in list(_running):
+        bus.stop()
+
+
+class InvalidationBus:
+    """
+    Broadcasts "these cache dependencies changed" events to every worker
+    process and hands the ones received from other workers to `on_message`.
+
+    Listener threads do not survive fork, so the bus (re)starts itself the
+    first time it is used in a new process.
+    """
+    max_payload = 8000
+
+    def __init__(self, on_message, poll_interval=1.0):
+        self.on_message = on_message
+        self.poll_interval = poll_interval
+        self._pid = None
+        self._sender_id = None
+        self._stopped = threading.Event()
+        self._lock = threading.Lock()
+
+    def ensure_running(self):
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._sender_id = f'{socket.gethostname()}:{self._pid}:{uuid.uuid4().hex[:8]}'
+            self._stopped = threading.Event()
+            self._start()
+            thread = threading.Thread(target=self._listen, name=type(self).__name__, daemon=True)
+            thread.start()
+            _running.add(self)
+
+    def stop(self):
+        self._stopped.set()
+
+    def publish(self, dependencies):
+        """Tell the other workers that `dependencies` changed"""
+        self.ensure_running()
+        dependencies = sorted(dependencies)
+        payload = json.dumps({'from': self._sender_id, 'deps': dependencies})
+        if len(payload) > self.max_payload:
+            payload = json.dumps({'from': self._sender_id, 'deps': [CLEAR_ALL]})
+        try:
+            self._send(payload)
+        except Exception:
+            logger.exception('Could not publish cache invalidation')
+
+    def _deliver(self, payload):
+        try:
+            message = json.loads(payload)
+        except ValueError:
+            logger.warning('Ignoring malformed cache invalidation message')
+            return
+        if message.get('from') != self._sender_id:
+            self.on_message(message.get('deps') or [])
+
+    def _start(self):
+        raise NotImplementedError
+
+    def _listen(self):
+        raise NotImplementedError
+
+    def _send(self, payload):
+        raise NotImplementedError
+
+
+class LocalBus(InvalidationBus):
+    """
+    Single-host bus: each worker binds a Unix datagram socket in a shared
+    directory and publishing sends one datagram to every other socket there.
+    Delivery is immediate; sockets left behind by dead workers are removed.
+    """
+    max_payload = 60000
+
+    def __init__(self, on_message, directory=None, poll_interval=1.0):
+        super().__init__(on_message, poll_interval)
+        self.directory = directory or os.path.join(tempfile.gettempdir(), 'alert-server-cache-bus')
+        self._socket = None
+        self._path = None
+
+    def _start(self):
+        os.makedirs(self.directory, exist_ok=True)
+        self._path = os.path.join(self.directory, f'{os.getpid()}.sock')
+        if os.path.exists(self._path):
+            os.unlink(self._path)
+        self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self._socket.bind(self._path)
+        self._socket.settimeout(self.poll_interval)
+
+    def stop(self):
+        super().stop()
+        if self._path and self._pid == os.getpid() and os.path.exists(self._path):
+            os.unlink(self._path)
+
+    def _listen(self):
+        sock = self._socket
+        while not self._stopped.is_set():
+            try:
+                data = sock.recv(self.max_payload + 1024)
+            except socket.timeout:
+                continue
+            except OSError:
+                break
+            self._deliver(data.decode('utf-8'))
+
+    def _send(self, payload):
+        data = payload.encode('utf-8')
+        own = os.path.basename(self._path)
+        with socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM) as sender:
+            for name in os.listdir(self.directory):
+                if name == own or not name.endswith('.sock'):
+                    continue
+                path = os.path.join(self.directory, name)
+                try:
+                    sender.sendto(data, path)
+                except (ConnectionRefusedError, FileNotFoundError):
+                    # Nobody is bound there any more: the worker died without cleaning up
+                    try:
+                        os.unlink(path)
+                    except OSError:
+                        pass
+                except OSError:
+                    logger.warning('Could not deliver cache invalidation to %s', path)
+
+
+class PostgresBus(InvalidationBus):
+    """
+    Multi-host bus on Postgres LISTEN/NOTIFY. Needs a direct (session mode)
+    connection: PgBouncer in transaction mode does not relay notifications.
+
+    A listener that loses its connection clears the local cache once it is
+    back, since notifications sent in the meantime are lost.
+    """
+    max_payload = 7900
+
+    def __init__(self, on_message, dsn, channel='response_cache', poll_interval=1.0, on_reconnect=None):
+        super().__init__(on_message, poll_interval)
+        self.dsn = dsn
+        self.channel = channel
+        self.on_reconnect = on_reconnect
+        self._publisher = None
+        self._send_lock = threading.Lock()
+
+    def _connect(self):
+        import psycopg2
+        import psycopg2.extensions
+        conn = psycopg2.connect(self.dsn)
+        conn.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+        return conn
+
+    def _start(self):
+        self._publisher = None
+
+    def _listen(self):
+        from psycopg2 import sql
+        first = True
+        while not self._stopped.is_set():
+            try:
+                conn = self._connect()
+                with conn.cursor() as cursor:
+                    cursor.execute(sql.SQL('LISTEN {}').format(sql.Identifier(self.channel)))
+                if not first and self.on_reconnect:
+                    self.on_reconnect()
+                first = False
+                while not self._stopped.is_set():
+                    if select.select([conn], [], [], self.poll_interval) == ([], [], []):
+                        continue
+                    conn.poll()
+                    while conn.notifies:
+                        self._deliver(conn.notifies.pop(0).payload)
+            except Exception:
+                logger.exception('Cache invalidation listener lost its connection; reconnecting')
+                time.sleep(self.poll_interval)
+
+    def _send(self, payload):
+        with self._send_lock:
+            for attempt in (1, 2):
+                try:
+                    if self._publisher is None or self._publisher.closed:
+                        self._publisher = self._connect()
+                    with self._publisher.cursor() as cursor:
+                        cursor.execute('SELECT pg_notify(%s, %s)', (self.channel, payload))
+                    return
+                except Exception:
+                    self._publisher = None
+                    if attempt == 2:
+                        raise
+
+
+def create_bus(app, on_message, on_reconnect=None):
+    """Build the bus selected by CACHE_BUS ('local', 'postgres' or 'none')"""
+    backend = (app.config.get('CACHE_BUS') or 'none').lower()
+    poll_interval = float(app.config.get('CACHE_BUS_POLL_INTERVAL', 1.0))
+    if backend == 'local':
+        return LocalBus(on_message, app.config.get('CACHE_BUS_DIR'), poll_interval)
+    if backend == 'postgres':
+        from sqlalchemy.engine import make_url
+        url = make_url(app.config.get('CACHE_BUS_URL') or app.config['SQLALCHEMY_DATABASE_URI'])
+        dsn = url.set(drivername='postgresql').render_as_string(hide_password=False)
+        return PostgresBus(on_message, dsn, app.config.get('CACHE_BUS_CHANNEL', 'response_cache'),
+                           poll_interval, on_reconnect)
+    if backend != 'none':
+        raise ValueError(f"Unknown CACHE_BUS backend '{backend}'")
+    return None
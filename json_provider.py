@@ -0,0 +1,106 @@
+# json_provider.py
+import dataclasses
+import decimal
+import json
+import uuid
+from datetime import date, datetime, time
+from flask import current_app
+from flask.json.provider import DefaultJSONProvider
+from metrics import serialization_timer
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+JSON_BACKENDS = ('auto', 'orjson', 'stdlib')
+
+
+def _default(o):
+    """Types the encoders do not handle natively; the stdlib gets datetime/UUID here too"""
+    if isinstance(o, (datetime, date, time)):
+        return o.isoformat()
+    if isinstance(o, (decimal.Decimal, uuid.UUID)):
+        return str(o)
+    if dataclasses.is_dataclass(o) and not isinstance(o, type):
+        return dataclasses.asdict(o)
+    if hasattr(o, '__html__'):
+        return str(o.__html__())
+    raise TypeError(f'Object of type {type(o).__name__} is not JSON serializable')
+
+
+class JSONProvider(DefaultJSONProvider):
+    """
+    Flask JSON provider backed by orjson when it is installed (JSON_BACKEND
+    'auto' or 'orjson'), the stdlib json module otherwise. Both write
+    datetimes and dates as ISO 8601 and UUIDs as strings, and encoding time
+    is counted as the request's serialization time.
+    """
+
+    sort_keys = False
+
+    def __init__(self, app):
+        super().__init__(app)
+        backend = (app.config.get('JSON_BACKEND') or 'auto').lower()
+        if backend not in JSON_BACKENDS:
+            raise ValueError(f"Unknown JSON_BACKEND '{backend}'")
+        if backend == 'orjson' and orjson is None:
+            raise RuntimeError("JSON_BACKEND is 'orjson' but orjson is not installed")
+        self.backend = 'orjson' if backend != 'stdlib' and orjson is not None else 'stdlib'
+        self.sort_keys = bool(app.config.get('JSON_SORT_KEYS', self.sort_keys))
+
+    def _pretty(self):
+        return (self.compact is None and self._app.debug) or self.compact is False
+
+    def _encode(self, obj, pretty=False):
+        if self.backend == 'orjson':
+            option = orjson.OPT_NON_STR_KEYS
+            if self.sort_keys:
+                option |= orjson.OPT_SORT_KEYS
+            if pretty:
+                option |= orjson.OPT_INDENT_2
+            return orjson.dumps(obj, default=_default, option=option)
+        return json.dumps(obj, default=_default, ensure_ascii=self.ensure_ascii, sort_keys=self.sort_keys,
+                          **({'indent': 2} if pretty else {'separators': (',', ':')}))
+
+    def dump_bytes(self, obj, pretty=False):
+        """Encode `obj` to UTF-8 bytes, the form responses are sent in"""
+        with serialization_timer():
+            data = self._encode(obj, pretty)
+        return data if self.backend == 'orjson' else data.encode('utf-8')
+
+    def dumps(self, obj, **kwargs):
+        with serialization_timer():
+            if not kwargs:
+                data = self._encode(obj)
+                return data.decode('utf-8') if self.backend == 'orjson' else data
+            kwargs.setdefault('default', _default)
+            kwargs.setdefault('ensure_ascii', self.ensure_ascii)
+            kwargs.setdefault('sort_keys', self.sort_keys)
+            return json.dumps(obj, **kwargs)
+
+    def loads(self, s, **kwargs):
+        if self.backend == 'orjson' and not kwargs:
+            return orjson.loads(s)
+        return json.loads(s, **kwargs)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(self.dump_bytes(obj, self._pretty()) + b'\n', mimetype=self.mimetype)
+
+
+def output_json(data, code, headers=None):
+    """Flask-RESTful representation for application/json, encoded by the app's JSON provider"""
+    provider = current_app.json
+    response = current_app.response_class(provider.dump_bytes(data, provider._pretty()) + b'\n',
+                                          status=code, mimetype=provider.mimetype)
+    response.headers.extend(headers or {})
+    return response
+
+
+def init_app(app, api=None):
+    """Install the provider on `app` and, if given, as `api`'s JSON representation"""
+    app.json = JSONProvider(app)
+    if api is not None:
+        api.representation('application/json')(output_json)
+    return app.json
@@ -0,0 +1,32 @@
+# markdown_render.py
+import hashlib
+from markdown_it import MarkdownIt
+
+# Raw HTML in the source is escaped rather than passed through, and markdown-it
+# refuses javascript:/vbscript:/file: links, so the output is safe to embed as-is
+_markdown = MarkdownIt('commonmark', {'html': False}).enable(['table', 'strikethrough'])
+
+
+def body_digest(body):
+    """Content hash used to tell whether a body needs re-rendering"""
+    return hashlib.sha256((body or '').encode('utf-8')).hexdigest()
+
+
+def render_markdown(body):
+    """Render a Markdown body to sanitized HTML"""
+    return _markdown.render(body or '')
+
+
+def render_with_digest(body):
+    """(html, digest) for a body; top-level so process pools can pickle it"""
+    return render_markdown(body), body_digest(body)
+
+
+def refresh_body_html(post):
+    """Re-render `post.body_html` unless the body hash shows it is current"""
+    digest = body_digest(post.body)
+    if post.body_hash == digest and post.body_html is not None:
+        return False
+    post.body_html = render_markdown(post.body)
+    post.body_hash = digest
+    return True
@@ -0,0 +1,217 @@
+# metrics.py
+import atexit
+import contextvars
+import json
+import os
+import threading
+import time
+import uuid
+import weakref
+from bisect import bisect_left
+from flask import Response, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from extensions import extension_proxy
+
+# Upper bounds (seconds) of the request latency histogram buckets
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Positions in a series' value list; histogram bucket counts follow
+COUNT, SECONDS, QUERIES, DB_SECONDS, SERIALIZE_SECONDS, BYTES = range(6)
+FIRST_BUCKET = 6
+
+# [queries, db seconds, serialization seconds, start time] of the request running in this context
+_current = contextvars.ContextVar('request_metrics', default=None)
+
+
+class RequestMetrics:
+    """
+    Per-endpoint request counters and latency histograms, kept in memory.
+
+    With `directory` set (METRICS_DIR), every worker process also dumps its
+    counters there every `flush_interval` seconds so /metrics can report the
+    sum over all gunicorn workers rather than only the one that answered.
+    """
+
+    def __init__(self, enabled=True, server_timing=False, directory=None, flush_interval=10.0):
+        self.enabled = enabled
+        self.server_timing = server_timing
+        self.directory = directory
+        self.flush_interval = flush_interval
+        self._series = {}
+        self._lock = threading.Lock()
+        self._pid = None
+        self._path = None
+
+    def init_app(self, app):
+        app.extensions['request_metrics'] = self
+        self.enabled = bool(app.config.get('METRICS_ENABLED', self.enabled))
+        self.server_timing = bool(app.config.get('METRICS_SERVER_TIMING', self.server_timing))
+        self.directory = app.config.get('METRICS_DIR') or self.directory
+        self.flush_interval = float(app.config.get('METRICS_FLUSH_INTERVAL', self.flush_interval))
+        if not self.enabled:
+            return
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+        app.add_url_rule('/metrics', 'metrics', self.view)
+
+    def _before_request(self):
+        _current.set([0, 0.0, 0.0, time.perf_counter()])
+
+    def _after_request(self, response):
+        stats = _current.get()
+        if stats is None:
+            return response
+        _current.set(None)
+        queries, db_seconds, serialize_seconds, started = stats
+        elapsed = time.perf_counter() - started
+        size = 0 if response.is_streamed else (response.content_length or 0)
+        self.observe(request.endpoint or 'unmatched', request.method, response.status_code,
+                     elapsed, queries, db_seconds, serialize_seconds, size)
+        if self.server_timing:
+            response.headers['Server-Timing'] = (
+                f'db;dur={db_seconds * 1000:.2f};desc="{queries} queries", '
+                f'serialize;dur={serialize_seconds * 1000:.2f}, '
+                f'app;dur={elapsed * 1000:.2f}')
+        return response
+
+    def observe(self, endpoint, method, status, seconds, queries, db_seconds, serialize_seconds, size):
+        key = (endpoint, method, str(status))
+        bucket = FIRST_BUCKET + bisect_left(BUCKETS, seconds)
+        with self._lock:
+            if self._pid != os.getpid():
+                self._start()
+            values = self._series.get(key)
+            if values is None:
+                values = self._series[key] = [0, 0.0, 0, 0.0, 0.0, 0] + [0] * (len(BUCKETS) + 1)
+            values[COUNT] += 1
+            values[SECONDS] += seconds
+            values[QUERIES] += queries
+            values[DB_SECONDS] += db_seconds
+            values[SERIALIZE_SECONDS] += serialize_seconds
+            values[BYTES] += size
+            values[bucket] += 1
+
+    def _start(self):
+        # Called with the lock held, once per process: counts from before a fork belong to the parent
+        self._pid = os.getpid()
+        self._series = {}
+        if self.directory:
+            os.makedirs(self.directory, exist_ok=True)
+            self._path = os.path.join(self.directory, f'{self._pid}-{uuid.uuid4().hex[:8]}.json')
+            threading.Thread(target=self._run, name='RequestMetrics', daemon=True).start()
+            _dumping.add(self)
+
+    def _run(self):
+        while True:
+            time.sleep(self.flush_interval)
+            self.dump()
+
+    def snapshot(self):
+        with self._lock:
+            return {key: list(values) for key, values in self._series.items()}
+
+    def dump(self):
+        """Write this process's counters to its file in `directory`"""
+        if not self._path or self._pid != os.getpid():
+            return
+        payload = json.dumps([[*key, values] for key, values in self.snapshot().items()])
+        temporary = f'{self._path}.tmp'
+        with open(temporary, 'w') as f:
+            f.write(payload)
+        os.replace(temporary, self._path)
+
+    def collect(self):
+        """Counters summed over every process sharing `directory` (or just this one)"""
+        if not self.directory:
+            return self.snapshot()
+        self.dump()
+        totals = {}
+        for name in os.listdir(self.directory):
+            if not name.endswith('.json'):
+                continue
+            try:
+                with open(os.path.join(self.directory, name)) as f:
+                    series = json.load(f)
+            except (OSError, ValueError):
+                continue
+            for endpoint, method, status, values in series:
+                current = totals.setdefault((endpoint, method, status), [0] * len(values))
+                for index, value in enumerate(values):
+                    current[index] += value
+        return totals
+
+    def render(self):
+        """Prometheus text exposition of the collected counters"""
+        series = sorted(self.collect().items())
+        lines = [
+            '# HELP http_request_duration_seconds Time spent handling requests.',
+            '# TYPE http_request_duration_seconds histogram',
+        ]
+        for (endpoint, method, status), values in series:
+            labels = f'endpoint="{endpoint}",method="{method}",status="{status}"'
+            cumulative = 0
+            for bound, count in zip(BUCKETS + (float('inf'),), values[FIRST_BUCKET:]):
+                cumulative += count
+                le = '+Inf' if bound == float('inf') else repr(bound)
+                lines.append(f'http_request_duration_seconds_bucket{{{labels},le="{le}"}} {cumulative}')
+            lines.append(f'http_request_duration_seconds_sum{{{labels}}} {values[SECONDS]}')
+            lines.append(f'http_request_duration_seconds_count{{{labels}}} {values[COUNT]}')
+
+        counters = (
+            ('db_queries_total', 'SQL statements executed while handling requests.', QUERIES),
+            ('db_query_duration_seconds_total', 'Time spent executing SQL statements.', DB_SECONDS),
+            ('serialization_duration_seconds_total', 'Time spent serializing response bodies.', SERIALIZE_SECONDS),
+            ('http_response_bytes_total', 'Response body bytes sent (streamed bodies excluded).', BYTES),
+        )
+        for name, help_text, index in counters:
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} counter')
+            for (endpoint, method, status), values in series:
+                lines.append(f'{name}{{endpoint="{endpoint}",method="{method}",status="{status}"}} {values[index]}')
+        return '\n'.join(lines) + '\n'
+
+    def view(self):
+        return Response(self.render(), mimetype='text/plain; version=0.0.4')
+
+
+request_metrics = extension_proxy('request_metrics')
+
+# Instances writing a metrics file; one exit hook dumps them all
+_dumping = weakref.WeakSet()
+
+
+@atexit.register
+def _dump_all():
+    for metrics in list(_dumping):
+        metrics.dump()
+
+
+class serialization_timer:
+    """Add the time spent in the block to the current request's serialization time"""
+    __slots__ = ('stats', 'started')
+
+    def __enter__(self):
+        self.stats = _current.get()
+        if self.stats is not None:
+            self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        if self.stats is not None:
+            self.stats[2] += time.perf_counter() - self.started
+
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _query_started(conn, cursor, statement, parameters, context, executemany):
+    if context is not None and _current.get() is not None:
+        context._metrics_started = time.perf_counter()
+
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def _query_finished(conn, cursor, statement, parameters, context, executemany):
+    stats = _current.get()
+    started = getattr(context, '_metrics_started', None)
+    if stats is not None and started is not None:
+        stats[0] += 1
+        stats[1] += time.perf_counter() - started
@@ -0,0 +1,76 @@
+"""add post full-text search
+
+Revision ID: 8b3e51f0c6a2
+Revises: 4f2a9c7d1e38
+Create Date: 2026-10-17 11:40:03.221476
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8b3e51f0c6a2'
+down_revision = '4f2a9c7d1e38'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    dialect = op.get_bind().dialect.name
+
+    if dialect == 'postgresql':
+        # Generated column: Postgres keeps it current on every INSERT/UPDATE
+        op.execute("""
+            ALTER TABLE posts ADD COLUMN search_vector tsvector
+            GENERATED ALWAYS AS (
+                setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+                setweight(to_tsvector('english', coalesce(excerpt, '')), 'B') ||
+                setweight(to_tsvector('english', coalesce(body, '')), 'C')
+            ) STORED
+        """)
+        op.execute("CREATE INDEX ix_posts_search_vector ON posts USING gin (search_vector)")
+
+    elif dialect == 'sqlite':
+        # External-content FTS5 table kept in sync with posts by triggers
+        op.execute("""
+            CREATE VIRTUAL TABLE posts_fts USING fts5(
+                title, excerpt, body, content='posts', content_rowid='rowid'
+            )
+        """)
+        op.execute("""
+            CREATE TRIGGER posts_fts_ai AFTER INSERT ON posts BEGIN
+                INSERT INTO posts_fts(rowid, title, excerpt, body)
+                VALUES (new.rowid, new.title, new.excerpt, new.body);
+            END
+        """)
+        op.execute("""
+            CREATE TRIGGER posts_fts_ad AFTER DELETE ON posts BEGIN
+                INSERT INTO posts_fts(posts_fts, rowid, title, excerpt, body)
+                VALUES ('delete', old.rowid, old.title, old.excerpt, old.body);
+            END
+        """)
+        op.execute("""
+            CREATE TRIGGER posts_fts_au AFTER UPDATE OF title, excerpt, body ON posts BEGIN
+                INSERT INTO posts_fts(posts_fts, rowid, title, excerpt, body)
+                VALUES ('delete', old.rowid, old.title, old.excerpt, old.body);
+                INSERT INTO posts_fts(rowid, title, excerpt, body)
+                VALUES (new.rowid, new.title, new.excerpt, new.body);
+            END
+        """)
+        # Index the posts that already exist
+        op.execute("INSERT INTO posts_fts(posts_fts) VALUES ('rebuild')")
+
+
+def downgrade():
+    dialect = op.get_bind().dialect.name
+
+    if dialect == 'postgresql':
+        op.execute("DROP INDEX IF EXISTS ix_posts_search_vector")
+        op.execute("ALTER TABLE posts DROP COLUMN IF EXISTS search_vector")
+
+    elif dialect == 'sqlite':
+        op.execute("DROP TRIGGER IF EXISTS posts_fts_au")
+        op.execute("DROP TRIGGER IF EXISTS posts_fts_ad")
+        op.execute("DROP TRIGGER IF EXISTS posts_fts_ai")
+        op.execute("DROP TABLE IF EXISTS posts_fts")
@@ -0,0 +1,46 @@
+"""add listing indexes
+
+Revision ID: c71d0e4a9b5f
+Revises: 8b3e51f0c6a2
+Create Date: 2026-10-17 13:05:27.904611
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c71d0e4a9b5f'
+down_revision = '8b3e51f0c6a2'
+branch_labels = None
+depends_on = None
+
+# name, table, columns: every listing sorts by (created_at DESC, id DESC)
+INDEXES = [
+    ('ix_posts_created_at_id', 'posts', [sa.text('created_at DESC'), sa.text('id DESC')]),
+    ('ix_posts_status_created_at_id', 'posts', ['status', sa.text('created_at DESC'), sa.text('id DESC')]),
+    ('ix_posts_author_id_created_at_id', 'posts', ['author_id', sa.text('created_at DESC'), sa.text('id DESC')]),
+    ('ix_post_tags_tag_id_post_id', 'post_tags', ['tag_id', 'post_id']),
+]
+
+
+def upgrade():
+    if op.get_bind().dialect.name == 'postgresql':
+        # CREATE INDEX CONCURRENTLY cannot run inside a transaction, but it keeps writes flowing
+        with op.get_context().autocommit_block():
+            for name, table, columns in INDEXES:
+                op.create_index(name, table, columns, unique=False,
+                                postgresql_concurrently=True, if_not_exists=True)
+    else:
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, unique=False, if_not_exists=True)
+
+
+def downgrade():
+    if op.get_bind().dialect.name == 'postgresql':
+        with op.get_context().autocommit_block():
+            for name, table, columns in reversed(INDEXES):
+                op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
+    else:
+        for name, table, columns in reversed(INDEXES):
+            op.drop_index(name, table_name=table, if_exists=True)
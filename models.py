@@ -2,17 +2,22 @@
 from flask_sqlalchemy import SQLAlchemy
 from sqlalchemy_serializer import SerializerMixin
 from sqlalchemy import MetaData, event
-from sqlalchemy.orm import validates
+from sqlalchemy.orm import validates, object_session
 import uuid
 from datetime import datetime
 import re
 from slugify import slugify 
+from markdown_render import refresh_body_html
+from cache import invalidate_on_commit, COLLECTION
+from replicas import RoutingSession
 
 metadata = MetaData(naming_convention={
+    "ix": "ix_%(column_0_label)s",
     "fk": "fk_%(table_name)s_%(column_0_name)s_%(referred_table_name)s",
 })
 
-db = SQLAlchemy(metadata=metadata)
+# GET/HEAD reads may be routed to read replicas (see replicas.py)
+db = SQLAlchemy(metadata=metadata, session_options={'class_': RoutingSession})
 
 class User(db.Model, SerializerMixin):
     __tablename__ = 'users'
@@ -69,6 +74,7 @@ class Post(db.Model, SerializerMixin):
     excerpt = db.Column(db.Text, nullable=True)
     body = db.Column(db.Text, nullable=False)
     body_html = db.Column(db.Text, nullable=True)
+    body_hash = db.Column(db.String(64), nullable=True)
     status = db.Column(db.String(20), nullable=False, default='draft')
     cover_image = db.Column(db.String(1024), nullable=True)
     author_id = db.Column(db.String(36), db.ForeignKey('users.id', ondelete='SET NULL'), nullable=True)
@@ -79,7 +85,14 @@ class Post(db.Model, SerializerMixin):
     
     tags = db.relationship('Tag', secondary='post_tags', back_populates='posts')
     
-    serialize_rules = ('-author.posts', '-tags.posts')
+    # Match the listing filters, which always sort by (created_at DESC, id DESC)
+    __table_args__ = (
+        db.Index('ix_posts_created_at_id', created_at.desc(), id.desc()),
+        db.Index('ix_posts_status_created_at_id', status, created_at.desc(), id.desc()),
+        db.Index('ix_posts_author_id_created_at_id', author_id, created_at.desc(), id.desc()),
+    )
+    
+    serialize_rules = ('-author.posts', '-tags.posts', '-body_hash')
     
     @validates('title')
     def validate_title(self, key, title):
@@ -107,7 +120,9 @@ class Post(db.Model, SerializerMixin):
 # Association table
 post_tags = db.Table('post_tags',
     db.Column('post_id', db.String(36), db.ForeignKey('posts.id', ondelete='CASCADE'), primary_key=True),
-    db.Column('tag_id', db.Integer, db.ForeignKey('tags.id', ondelete='CASCADE'), primary_key=True)
+    db.Column('tag_id', db.Integer, db.ForeignKey('tags.id', ondelete='CASCADE'), primary_key=True),
+    # The primary key covers lookups by post; this one serves tag filters
+    db.Index('ix_post_tags_tag_id_post_id', 'tag_id', 'post_id')
 )
 
 # Event listener to update the updated_at timestamp automatically
@@ -115,6 +130,38 @@ post_tags = db.Table('post_tags',
 def update_updated_at(mapper, connection, target):
     target.updated_at = datetime.utcnow()
 
+# Event listeners to render the Markdown body to HTML when it changes
+@event.listens_for(Post, 'before_insert')
+def render_post_body_html(mapper, connection, target):
+    refresh_body_html(target)
+
+@event.listens_for(Post, 'before_update')
+def rerender_post_body_html(mapper, connection, target):
+    if db.inspect(target).attrs.body.history.has_changes():
+        refresh_body_html(target)
+
 @event.listens_for(User, 'before_update')
 def update_user_updated_at(mapper, connection, target):
-    target.updated_at = datetime.utcnow()
\ No newline at end of file
+    target.updated_at = datetime.utcnow()
+
+# Event listeners to drop cached API responses built from changed rows.
+# Changes to a post's tags mark the post dirty, so post_tags writes from the
+# ORM arrive here as Post updates; bulk statements are handled in cache.py.
+@event.listens_for(Post, 'after_insert')
+def invalidate_post_lists(mapper, connection, target):
+    invalidate_on_commit(object_session(target), COLLECTION)
+
+@event.listens_for(Post, 'after_update')
+@event.listens_for(Post, 'after_delete')
+def invalidate_post(mapper, connection, target):
+    invalidate_on_commit(object_session(target), COLLECTION, f'post:{target.id}')
+
+@event.listens_for(Tag, 'after_update')
+@event.listens_for(Tag, 'after_delete')
+def invalidate_tag(mapper, connection, target):
+    invalidate_on_commit(object_session(target), COLLECTION, f'tag:{target.id}')
+
+@event.listens_for(User, 'after_update')
+@event.listens_for(User, 'after_delete')
+def invalidate_user(mapper, connection, target):
+    invalidate_on_commit(object_session(target), f'user:{target.id}')
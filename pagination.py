@@ -0,0 +1,61 @@
+# pagination.py
+import base64
+import json
+from datetime import datetime
+from sqlalchemy import tuple_
+
+
+class InvalidCursor(ValueError):
+    """Raised when a client sends a cursor we did not issue"""
+
+
+def encode_cursor(post):
+    """Build an opaque cursor from a post's (created_at, id) sort key"""
+    raw = json.dumps([post.created_at.isoformat(), post.id], separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Turn an opaque cursor back into a (created_at, id) sort key"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        created_at, post_id = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        return datetime.fromisoformat(created_at), str(post_id)
+    except (ValueError, TypeError, UnicodeError):
+        raise InvalidCursor('Invalid cursor')
+
+
+def keyset_paginate(query, created_at_col, id_col, per_page, after=None, before=None):
+    """
+    Seek through `query` ordered by (created_at DESC, id DESC).
+
+    `after` returns the rows that follow the cursor (older posts), `before`
+    the rows that precede it (newer posts). An empty `after` starts from the
+    newest post. Returns (items, next_cursor, prev_cursor).
+    """
+    if before:
+        created_at, post_id = decode_cursor(before)
+        rows = (query
+                .filter(tuple_(created_at_col, id_col) > tuple_(created_at, post_id))
+                .order_by(created_at_col.asc(), id_col.asc())
+                .limit(per_page + 1)
+                .all())
+        has_more = len(rows) > per_page
+        items = list(reversed(rows[:per_page]))
+        next_cursor = encode_cursor(items[-1]) if items else before
+        prev_cursor = encode_cursor(items[0]) if items and has_more else None
+        return items, next_cursor, prev_cursor
+
+    if after:
+        created_at, post_id = decode_cursor(after)
+        query = query.filter(tuple_(created_at_col, id_col) < tuple_(created_at, post_id))
+
+    rows = (query
+            .order_by(created_at_col.desc(), id_col.desc())
+            .limit(per_page + 1)
+            .all())
+    has_more = len(rows) > per_page
+    items = rows[:per_page]
+    next_cursor = encode_cursor(items[-1]) if items and has_more else None
+    prev_cursor = encode_cursor(items[0]) if items and after else None
+    return items, next_cursor, prev_cursor
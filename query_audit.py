@@ -0,0 +1,167 @@
+# query_audit.py
+import contextvars
+import logging
+import time
+import warnings
+from collections import Counter
+from contextlib import ContextDecorator
+from flask import request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from query_plans import explain_sql
+from extensions import extension, extension_proxy
+
+logger = logging.getLogger(__name__)
+
+AUDIT_MODES = ('off', 'log', 'warn', 'raise')
+
+# Statement counts and findings of the request being audited in this context
+_request = contextvars.ContextVar('query_audit_request', default=None)
+# Open query_budget blocks, innermost last
+_budgets = contextvars.ContextVar('query_budgets', default=())
+
+
+class QueryAuditWarning(UserWarning):
+    pass
+
+
+class QueryAuditError(AssertionError):
+    pass
+
+
+class QueryBudgetExceeded(QueryAuditError):
+    pass
+
+
+class QueryAudit:
+    """
+    Flags N+1 patterns (the same SQL run `repeat_threshold`+ times within one
+    request, differing only in parameters) and statements slower than
+    `slow_ms`, logged with their EXPLAIN plan.
+
+    Findings are logged, turned into QueryAuditWarning, or raised as
+    QueryAuditError at the end of the request, depending on `mode`.
+    """
+
+    def __init__(self, mode='off', slow_ms=200.0, repeat_threshold=5, explain=True):
+        self.mode = mode
+        self.slow_ms = slow_ms
+        self.repeat_threshold = repeat_threshold
+        self.explain = explain
+
+    def init_app(self, app):
+        app.extensions['query_audit'] = self
+        self.mode = (app.config.get('QUERY_AUDIT_MODE') or self.mode).lower()
+        if self.mode not in AUDIT_MODES:
+            raise ValueError(f"Unknown QUERY_AUDIT_MODE '{self.mode}'")
+        self.slow_ms = float(app.config.get('QUERY_AUDIT_SLOW_MS', self.slow_ms))
+        self.repeat_threshold = int(app.config.get('QUERY_AUDIT_REPEAT_THRESHOLD', self.repeat_threshold))
+        self.explain = bool(app.config.get('QUERY_AUDIT_EXPLAIN', self.explain))
+        if self.mode != 'off':
+            app.before_request(self._before_request)
+            app.after_request(self._after_request)
+
+    @property
+    def enabled(self):
+        return self.mode != 'off'
+
+    def _before_request(self):
+        _request.set({'counts': Counter(), 'findings': []})
+
+    def _after_request(self, response):
+        audit = _request.get()
+        if audit is None:
+            return response
+        _request.set(None)
+        findings = audit['findings']
+        for statement, count in audit['counts'].items():
+            if count >= self.repeat_threshold:
+                findings.append(f'Possible N+1: ran {count} times: {_shorten(statement)}')
+        if findings:
+            self.report(f'{request.method} {request.path}', findings)
+        return response
+
+    def report(self, where, findings):
+        message = f'Query audit for {where}:\n  ' + '\n  '.join(findings)
+        if self.mode == 'raise':
+            raise QueryAuditError(message)
+        if self.mode == 'warn':
+            warnings.warn(message, QueryAuditWarning, stacklevel=2)
+        logger.warning(message)
+
+    def slow_query(self, conn, cursor, statement, parameters, executemany, seconds):
+        finding = f'Slow query ({seconds * 1000:.1f} ms): {_shorten(statement)}'
+        if self.explain and not executemany and statement.lstrip().upper().startswith(('SELECT', 'WITH')):
+            try:
+                plan = explain_sql(conn.connection.dbapi_connection, conn.dialect.name, statement, parameters)
+                finding += '\n    ' + '\n    '.join(plan)
+            except Exception as e:
+                finding += f'\n    (no plan: {e})'
+        audit = _request.get()
+        if audit is not None:
+            audit['findings'].append(finding)
+        else:
+            self.report('a query outside a request', [finding])
+
+
+query_audit = extension_proxy('query_audit')
+
+
+def _shorten(statement, limit=300):
+    statement = ' '.join(statement.split())
+    return statement if len(statement) <= limit else statement[:limit] + '...'
+
+
+class query_budget(ContextDecorator):
+    """
+    Fail when the block (or decorated function, e.g. a test) runs more than
+    `max_queries` SQL statements:
+
+        with query_budget(3):
+            client.get('/api/v1/posts')
+    """
+
+    def __init__(self, max_queries):
+        self.max_queries = max_queries
+        self.statements = []
+
+    def __enter__(self):
+        self.statements = []
+        self._token = _budgets.set(_budgets.get() + (self,))
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        _budgets.reset(self._token)
+        if exc_type is None and len(self.statements) > self.max_queries:
+            listing = '\n  '.join(_shorten(statement, 200) for statement in self.statements)
+            raise QueryBudgetExceeded(
+                f'{len(self.statements)} queries run, budget is {self.max_queries}:\n  {listing}')
+        return False
+
+    @property
+    def count(self):
+        return len(self.statements)
+
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _audit_started(conn, cursor, statement, parameters, context, executemany):
+    audit = extension('query_audit')
+    if context is not None and audit is not None and audit.enabled:
+        context._audit_started = time.perf_counter()
+
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def _audit_finished(conn, cursor, statement, parameters, context, executemany):
+    for budget in _budgets.get():
+        budget.statements.append(statement)
+
+    audit = _request.get()
+    if audit is not None:
+        audit['counts'][statement] += 1
+
+    started = getattr(context, '_audit_started', None)
+    auditor = extension('query_audit') if started is not None else None
+    if auditor is not None:
+        seconds = time.perf_counter() - started
+        if seconds * 1000 >= auditor.slow_ms:
+            auditor.slow_query(conn, cursor, statement, parameters, executemany, seconds)
@@ -0,0 +1,62 @@
+# query_plans.py
+import re
+from sqlalchemy import event
+
+
+def explain(connection, statement):
+    """Return the plan lines the database would use to run `statement`"""
+    sqlite = connection.dialect.name == 'sqlite'
+    prefix = 'EXPLAIN QUERY PLAN ' if sqlite else 'EXPLAIN '
+
+    # Prefix the compiled SQL so parameters are bound exactly as for a real run
+    def add_prefix(conn, cursor, sql, parameters, context, executemany):
+        return prefix + sql, parameters
+
+    event.listen(connection, 'before_cursor_execute', add_prefix, retval=True)
+    try:
+        rows = connection.execute(statement).all()
+    finally:
+        event.remove(connection, 'before_cursor_execute', add_prefix)
+    return plan_lines(rows, connection.dialect.name)
+
+
+def explain_sql(dbapi_connection, dialect_name, sql, parameters):
+    """
+    Plan for already-compiled `sql`, run on a fresh DBAPI cursor so engine
+    events do not fire. On Postgres it runs inside a savepoint: a failed
+    EXPLAIN must not abort the caller's transaction.
+    """
+    sqlite = dialect_name == 'sqlite'
+    cursor = dbapi_connection.cursor()
+    try:
+        if not sqlite:
+            cursor.execute('SAVEPOINT explain_plan')
+        try:
+            cursor.execute(('EXPLAIN QUERY PLAN ' if sqlite else 'EXPLAIN ') + sql, parameters)
+            rows = cursor.fetchall()
+        except Exception:
+            if not sqlite:
+                cursor.execute('ROLLBACK TO SAVEPOINT explain_plan')
+            raise
+        if not sqlite:
+            cursor.execute('RELEASE SAVEPOINT explain_plan')
+    finally:
+        cursor.close()
+    return plan_lines(rows, dialect_name)
+
+
+def plan_lines(rows, dialect_name):
+    """The human-readable line of each EXPLAIN result row"""
+    return [row[-1] if dialect_name == 'sqlite' else row[0] for row in rows]
+
+
+def scans_and_sorts(plan, dialect_name, table='posts'):
+    """True when `plan` reads all of `table` sequentially and then sorts"""
+    if dialect_name == 'sqlite':
+        # "SCAN posts [USING INDEX ...]" walks the whole table; "SEARCH posts ..." seeks
+        full_scan = any(re.match(rf'SCAN {table}(\s|$)', line.strip()) for line in plan)
+        sort = any('USE TEMP B-TREE FOR ORDER BY' in line for line in plan)
+    else:
+        full_scan = any(f'Seq Scan on {table}' in line for line in plan)
+        sort = any(line.strip().lstrip('-> ').startswith(('Sort', 'Incremental Sort')) for line in plan)
+    return full_scan and sort
@@ -0,0 +1,179 @@
+# replicas.py
+import itertools
+import logging
+import threading
+import time
+from flask import g, has_request_context, request
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event, text
+from db_pool import engine_options, ping
+from extensions import extension_proxy
+
+logger = logging.getLogger(__name__)
+
+# SQLALCHEMY_BINDS keys of the replicas: replica_0, replica_1, ...
+BIND_PREFIX = 'replica_'
+
+# Methods whose requests may read from a replica
+READ_METHODS = ('GET', 'HEAD')
+
+# Session.info key that pins a session to the primary
+USE_PRIMARY = 'use_primary'
+
+
+def replica_binds(config):
+    """SQLALCHEMY_BINDS entries for the comma separated REPLICA_URLS, pooled like the primary"""
+    urls = [url.strip() for url in (config.get('REPLICA_URLS') or '').split(',') if url.strip()]
+    binds = {}
+    for n, url in enumerate(urls):
+        binds[f'{BIND_PREFIX}{n}'] = dict(engine_options(dict(config, SQLALCHEMY_DATABASE_URI=url)), url=url)
+    return binds
+
+
+class ReplicaRouter:
+    """
+    Sends the reads of GET/HEAD requests to read replicas, round-robin over
+    the ones that passed their last health check, and everything else to
+    the primary: writes, flushes, requests outside a request context,
+    sessions pinned with `use_primary()`, and for `sticky_seconds` after a
+    write, the writing client's requests (via a cookie) so it reads its own
+    writes. With no healthy replica, reads fall back to the primary.
+
+    A replica is re-checked (SELECT 1, plus replay lag on Postgres) at most
+    every `check_interval` seconds, and marked down at once when one of its
+    connections fails with a disconnect error.
+    """
+
+    def __init__(self, check_interval=5.0, max_lag=None, sticky_seconds=5, cookie_name='read_primary'):
+        self.check_interval = check_interval
+        self.max_lag = max_lag
+        self.sticky_seconds = sticky_seconds
+        self.cookie_name = cookie_name
+        self.keys = ()
+        self._next = itertools.count()
+        self._health = {}
+        self._lock = threading.Lock()
+        self._watched = set()
+
+    def init_app(self, app):
+        app.extensions['replica_router'] = self
+        self.keys = tuple(sorted(key for key in app.config.get('SQLALCHEMY_BINDS') or {}
+                                 if key.startswith(BIND_PREFIX)))
+        self.check_interval = float(app.config.get('REPLICA_CHECK_INTERVAL', self.check_interval))
+        max_lag = app.config.get('REPLICA_MAX_LAG', self.max_lag)
+        self.max_lag = float(max_lag) if max_lag is not None else None
+        self.sticky_seconds = int(app.config.get('REPLICA_STICKY_SECONDS', self.sticky_seconds))
+        self.cookie_name = app.config.get('REPLICA_STICKY_COOKIE') or self.cookie_name
+        if self.keys:
+            app.after_request(self._after_request)
+
+    @property
+    def enabled(self):
+        return bool(self.keys)
+
+    @property
+    def lag_window(self):
+        """Seconds a replica may trail a write by (what replica-read responses must not be cached across)"""
+        return max(self.sticky_seconds, self.max_lag or 0)
+
+    def pinned(self):
+        """Whether the current request carries the read-your-writes cookie"""
+        return self.enabled and has_request_context() and self.cookie_name in request.cookies
+
+    def _after_request(self, response):
+        # Successful writes pin the client to the primary until replicas have caught up
+        if request.method not in READ_METHODS and response.status_code < 400 and self.sticky_seconds > 0:
+            response.set_cookie(self.cookie_name, '1', max_age=self.sticky_seconds, httponly=True, samesite='Lax')
+        return response
+
+    def reads_from_replica(self, session):
+        """Whether `session`'s reads may go to a replica right now"""
+        return (self.enabled
+                and not session.info.get(USE_PRIMARY)
+                and has_request_context()
+                and request.method in READ_METHODS
+                and not self.pinned())
+
+    def choose(self, engines):
+        """Next healthy replica engine, round-robin, or None when none is healthy"""
+        start = next(self._next)
+        for offset in range(len(self.keys)):
+            key = self.keys[(start + offset) % len(self.keys)]
+            engine = engines[key]
+            if self.healthy(key, engine):
+                return engine
+        return None
+
+    def healthy(self, key, engine):
+        healthy, checked_at = self._health.get(key, (True, None))
+        if checked_at is not None and time.monotonic() - checked_at < self.check_interval:
+            return healthy
+        with self._lock:
+            healthy, checked = self._health.get(key, (True, None))
+            if checked != checked_at:
+                return healthy
+            healthy = self.check(key, engine)
+            self._health[key] = (healthy, time.monotonic())
+        return healthy
+
+    def check(self, key, engine):
+        """Ping `engine` and, on Postgres with max_lag set, compare its replay lag"""
+        self._watch(key, engine)
+        try:
+            ping(engine)
+            if self.max_lag is not None and engine.dialect.name == 'postgresql':
+                with engine.connect() as connection:
+                    lag = connection.execute(text(
+                        'SELECT EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())')).scalar()
+                if lag is not None and lag > self.max_lag:
+                    logger.warning('Replica %s is %.1fs behind, reading from the primary', key, lag)
+                    return False
+        except Exception as e:
+            logger.warning('Replica %s failed its health check: %s', key, e)
+            return False
+        return True
+
+    def mark_down(self, key):
+        with self._lock:
+            self._health[key] = (False, time.monotonic())
+
+    def _watch(self, key, engine):
+        if engine in self._watched:
+            return
+        self._watched.add(engine)
+
+        @event.listens_for(engine, 'handle_error')
+        def _replica_error(context):
+            if context.is_disconnect:
+                logger.warning('Lost connection to replica %s, marking it down', key)
+                self.mark_down(key)
+
+    def status(self):
+        now = time.monotonic()
+        return {key: {'healthy': healthy, 'checked_seconds_ago': round(now - checked_at, 1)}
+                for key, (healthy, checked_at) in sorted(self._health.items())}
+
+
+replica_router = extension_proxy('replica_router')
+
+
+class RoutingSession(Session):
+    """Flask-SQLAlchemy session whose GET/HEAD reads go through `replica_router`"""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if (bind is None and not self._flushing and not getattr(clause, 'is_dml', False)
+                and has_request_context() and replica_router.reads_from_replica(self)):
+            # One replica per session, so a request reads from a single consistent snapshot
+            engine = self.info.get('replica')
+            if engine is None:
+                engine = self.info['replica'] = replica_router.choose(self._db.engines) or False
+            if engine:
+                # Tells the response cache this response may predate recent writes
+                g.replica_read = True
+                return engine
+        return super().get_bind(mapper, clause, bind, **kwargs)
+
+
+def use_primary(session):
+    """Send the rest of `session`'s statements to the primary (e.g. a GET that must see the latest data)"""
+    session.info[USE_PRIMARY] = True
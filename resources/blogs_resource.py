@@ -1,10 +1,19 @@
 # blogs_resource.py
 from flask_restful import Resource, reqparse
-from flask import request, jsonify
-from models import db, Post, User, Tag
+from flask import request, jsonify, abort
+from sqlalchemy import func, select
+from sqlalchemy.orm import joinedload, selectinload, load_only
+from models import db, Post, User, Tag, post_tags
 from datetime import datetime
 import uuid
 from slugify import slugify
+from pagination import keyset_paginate, InvalidCursor
+from serializers import serialize_post, parse_fields, default_fields
+from tagging import resolve_tags
+from conditional import make_etag, is_not_modified, not_modified, with_validators
+from cache import cached_response, cache_depends_on, caching_response, COLLECTION
+from view_counter import counts_views
+from search import ranked_matches, SearchNotSupported
 
 # Request parser for creating posts
 post_parser = reqparse.RequestParser()
@@ -17,39 +26,228 @@ post_parser.add_argument('author_id', type=str, required=True, help='Author ID i
 post_parser.add_argument('tags', type=str, action='append', required=False)
 post_parser.add_argument('slug', type=str, required=False)
 
+def post_query(fields=None):
+    """
+    Posts query that only selects the columns in `fields` (the rest stay
+    deferred in SQL) and batch-loads the author/tags relations it needs.
+    """
+    if fields is None:
+        return Post.query.options(joinedload(Post.author), selectinload(Post.tags))
+    
+    # id, created_at and updated_at are always needed for identity, cursors and ETags
+    columns = {'id', 'created_at', 'updated_at'}.union(f for f in fields if f not in ('author', 'tags'))
+    if 'author' in fields:
+        # The author join and the cache dependencies both need the foreign key
+        columns.add('author_id')
+    options = [load_only(*[getattr(Post, column) for column in sorted(columns)])]
+    if 'author' in fields:
+        options.append(joinedload(Post.author))
+    if 'tags' in fields:
+        options.append(selectinload(Post.tags))
+    return Post.query.options(*options)
+
+def tag_names(args):
+    """Tag names from ?tags=a,b,c (and the single-tag ?tag=), de-duplicated"""
+    names = []
+    for value in [args.get('tag')] + (args.get('tags') or '').split(','):
+        name = (value or '').strip()
+        if name and name not in names:
+            names.append(name)
+    return names
+
+def filtered_posts_query(args, fields=None):
+    """Build the posts query for the list filters in `args`"""
+    status = args.get('status', None)
+    author_id = args.get('author_id', None)
+    tags = tag_names(args)
+    match = args.get('match', 'all')
+    if match not in ('all', 'any'):
+        raise ValueError("Match must be either 'all' or 'any'")
+    
+    query = post_query(fields)
+    
+    if status:
+        query = query.filter(Post.status == status)
+    if author_id:
+        query = query.filter(Post.author_id == author_id)
+    if tags:
+        # Semi-join on post_tags: a post matches once however many of its tags match
+        tagged = (select(post_tags.c.post_id)
+                  .join(Tag, Tag.id == post_tags.c.tag_id)
+                  .where(Tag.name.in_(tags)))
+        if match == 'all' and len(tags) > 1:
+            tagged = tagged.group_by(post_tags.c.post_id).having(func.count(post_tags.c.tag_id) == len(tags))
+        query = query.filter(Post.id.in_(tagged))
+    
+    return query
+
+# Page size bounds for ?per_page=
+MAX_PER_PAGE = 100
+
+def page_size(default=10):
+    """?per_page= clamped to 1..MAX_PER_PAGE"""
+    return min(max(request.args.get('per_page', default, type=int), 1), MAX_PER_PAGE)
+
+# ?format= picks which body representation is returned
+BODY_FORMATS = {'markdown': 'body', 'html': 'body_html'}
+
+def requested_fields(default):
+    """Resolve ?fields= and ?format= into the post fields to load and return"""
+    fields = set(parse_fields(Post, request.args.get('fields'), default))
+    body_format = request.args.get('format')
+    if body_format:
+        if body_format not in BODY_FORMATS:
+            raise ValueError("Format must be either 'markdown' or 'html'")
+        if fields & set(BODY_FORMATS.values()):
+            fields -= set(BODY_FORMATS.values())
+            fields.add(BODY_FORMATS[body_format])
+    return tuple(key for key in default_fields(Post) if key in fields)
+
+def list_validators(query, fields):
+    """
+    Cheap collection validator for a filtered posts query: the row count and
+    newest updated_at (plus the newest author update when authors are embedded,
+    and the total views when they are shown, since flushing them skips updated_at).
+    """
+    query = query.order_by(None)
+    columns = [func.count(Post.id), func.max(Post.updated_at)]
+    if 'views' in fields:
+        columns.append(func.sum(Post.views))
+    if 'author' in fields:
+        query = query.outerjoin(Post.author)
+        columns.append(func.max(User.updated_at))
+    return tuple(query.with_entities(*columns).one())
+
+def page_etag(posts, fields, *extra):
+    """ETag for a page of posts built from its own rows (plus `extra` values such as cursors)"""
+    rows = [(post.id, post.updated_at, post.author.updated_at if 'author' in fields and post.author else None,
+             post.views if 'views' in fields else None)
+            for post in posts]
+    return make_etag(*extra, rows)
+
+def post_dependencies(posts, fields):
+    """Cache dependency tags for responses built from `posts`"""
+    dependencies = set()
+    for post in posts:
+        dependencies.add(f'post:{post.id}')
+        if 'author' in fields and post.author_id:
+            dependencies.add(f'user:{post.author_id}')
+        if 'tags' in fields:
+            dependencies.update(f'tag:{tag.id}' for tag in post.tags)
+    return dependencies
+
+def get_single_post(criterion, fields):
+    """Conditional GET for the post matching `criterion`"""
+    def validators(post_id, updated_at, author_updated_at, views):
+        if 'author' not in fields:
+            author_updated_at = None
+        if 'views' not in fields:
+            return make_etag(post_id, updated_at, author_updated_at), max(filter(None, (updated_at, author_updated_at)))
+        # View counts change without touching updated_at, so no Last-Modified can cover them
+        return make_etag(post_id, updated_at, author_updated_at, views), None
+    
+    # Answer revalidations from the timestamps alone, without loading the post
+    if request.if_none_match or request.if_modified_since:
+        row = db.session.execute(
+            select(Post.id, Post.updated_at, User.updated_at, Post.views)
+            .outerjoin(User, Post.author_id == User.id)
+            .where(criterion)).first()
+        if row is None:
+            abort(404)
+        etag, last_modified = validators(*row)
+        if is_not_modified(etag, last_modified):
+            return not_modified(etag, last_modified)
+    
+    post = post_query(fields).filter(criterion).first_or_404()
+    if caching_response():
+        cache_depends_on(*post_dependencies([post], fields))
+    etag, last_modified = validators(
+        post.id, post.updated_at,
+        post.author.updated_at if 'author' in fields and post.author else None,
+        post.views if 'views' in fields else None)
+    return with_validators(jsonify(serialize_post(post, fields)), etag, last_modified)
+
 class BlogPosts(Resource):
+    method_decorators = {'get': [cached_response, counts_views('post_id', 'id')]}
+    
     def get(self, post_id=None):
         """Get all posts or a specific post by ID"""
+        try:
+            # Sparse fieldsets: ?fields=summary|full|title,slug,... and ?format=markdown|html
+            fields = requested_fields('full' if post_id else 'summary')
+            if not post_id:
+                # Filters: ?status=, ?author_id=, ?tag= or ?tags=a,b&match=all|any
+                query = filtered_posts_query(request.args, fields)
+        except ValueError as e:
+            return {'message': str(e)}, 400
+        
         if post_id:
             # Get a specific post
-            post = Post.query.get_or_404(post_id)
-            return jsonify(post.to_dict())
+            return get_single_post(Post.id == post_id, fields)
         else:
             # Get all posts with optional filtering
-            page = request.args.get('page', 1, type=int)
-            per_page = request.args.get('per_page', 10, type=int)
-            status = request.args.get('status', None)
-            author_id = request.args.get('author_id', None)
-            tag = request.args.get('tag', None)
-            
-            query = Post.query
-            
-            if status:
-                query = query.filter(Post.status == status)
-            if author_id:
-                query = query.filter(Post.author_id == author_id)
-            if tag:
-                query = query.join(Post.tags).filter(Tag.name == tag)
-            
-            posts = query.order_by(Post.created_at.desc()).paginate(
-                page=page, per_page=per_page, error_out=False)
-            
-            return jsonify({
-                'posts': [post.to_dict() for post in posts.items],
+            per_page = page_size()
+            
+            # Cursor mode: ?after=<cursor> (an empty value starts at the top) or ?before=<cursor>
+            if 'after' in request.args or 'before' in request.args:
+                try:
+                    posts, next_cursor, prev_cursor = keyset_paginate(
+                        query, Post.created_at, Post.id, per_page,
+                        after=request.args.get('after'),
+                        before=request.args.get('before'))
+                except InvalidCursor as e:
+                    return {'message': str(e)}, 400
+                
+                # Page ETag: this page's rows and neighbours (the cursor itself is in the query string)
+                etag = page_etag(posts, fields, next_cursor, prev_cursor)
+                if is_not_modified(etag):
+                    return not_modified(etag)
+                if caching_response():
+                    cache_depends_on(COLLECTION, *post_dependencies(posts, fields))
+                
+                response = {
+                    'posts': [serialize_post(post, fields) for post in posts],
+                    'next_cursor': next_cursor,
+                    'prev_cursor': prev_cursor,
+                    'per_page': per_page
+                }
+                if request.args.get('include_total', 'false').lower() == 'true':
+                    total = query.order_by(None).with_entities(func.count(Post.id)).scalar()
+                    response['total'] = total
+                    response['pages'] = -(-total // per_page)
+                return with_validators(jsonify(response), etag)
+            
+            # Offset mode: ?page=N&per_page=M
+            page = max(request.args.get('page', 1, type=int), 1)
+            include_total = request.args.get('include_total', 'true').lower() == 'true'
+            
+            # Collection ETag over the whole filtered set when the total or the cache needs that query anyway;
+            # it answers revalidations before the page is loaded
+            validators = None
+            if include_total or caching_response():
+                validators = list_validators(query, fields)
+                etag = make_etag(*validators)
+                if is_not_modified(etag):
+                    return not_modified(etag)
+            
+            posts = query.order_by(Post.created_at.desc(), Post.id.desc()).paginate(
+                page=page, per_page=per_page, error_out=False, count=False)
+            if include_total:
+                posts.total = validators[0]
+            if validators is None:
+                # Without the total the response is fully determined by the page's rows
+                etag = page_etag(posts.items, fields)
+                if is_not_modified(etag):
+                    return not_modified(etag)
+            if caching_response():
+                cache_depends_on(COLLECTION, *post_dependencies(posts.items, fields))
+            
+            return with_validators(jsonify({
+                'posts': [serialize_post(post, fields) for post in posts.items],
                 'total': posts.total,
-                'pages': posts.pages,
+                'pages': posts.pages if include_total else None,
                 'current_page': page
-            })
+            }), etag)
     
     def post(self):
         """Create a new blog post"""
@@ -85,21 +283,14 @@ class BlogPosts(Resource):
             if args['status'] == 'published':
                 post.published_at = datetime.utcnow()
             
-            # Handle tags
+            # Handle tags (resolved set-wise, created in bulk if missing)
             if args.get('tags'):
-                for tag_name in args['tags']:
-                    tag = Tag.query.filter_by(name=tag_name).first()
-                    if not tag:
-                        # Create new tag if it doesn't exist
-                        tag_slug = slugify(tag_name)
-                        tag = Tag(name=tag_name, slug=tag_slug)
-                        db.session.add(tag)
-                    post.tags.append(tag)
+                post.tags = resolve_tags(args['tags'])
             
             db.session.add(post)
             db.session.commit()
             
-            return post.to_dict(), 201
+            return serialize_post(post), 201
             
         except Exception as e:
             db.session.rollback()
@@ -132,19 +323,11 @@ class BlogPosts(Resource):
             
             # Handle tags if provided
             if 'tags' in args and args['tags'] is not None:
-                post.tags = []
-                for tag_name in args['tags']:
-                    tag = Tag.query.filter_by(name=tag_name).first()
-                    if not tag:
-                        # Create new tag if it doesn't exist
-                        tag_slug = slugify(tag_name)
-                        tag = Tag(name=tag_name, slug=tag_slug)
-                        db.session.add(tag)
-                    post.tags.append(tag)
+                post.tags = resolve_tags(args['tags'])
             
             db.session.commit()
             
-            return post.to_dict()
+            return serialize_post(post)
             
         except Exception as e:
             db.session.rollback()
@@ -164,7 +347,59 @@ class BlogPosts(Resource):
             return {'message': f'Error deleting post: {str(e)}'}, 500
 
 class BlogPostBySlug(Resource):
+    method_decorators = {'get': [cached_response, counts_views('slug', 'slug')]}
+    
     def get(self, slug):
         """Get a post by its slug"""
-        post = Post.query.filter_by(slug=slug).first_or_404()
-        return jsonify(post.to_dict())
\ No newline at end of file
+        try:
+            fields = requested_fields('full')
+        except ValueError as e:
+            return {'message': str(e)}, 400
+        
+        return get_single_post(Post.slug == slug, fields)
+
+class PostSearch(Resource):
+    method_decorators = {'get': [cached_response]}
+    
+    def get(self):
+        """Full-text search over post titles, excerpts and bodies, best match first"""
+        q = request.args.get('q', '').strip()
+        if not q:
+            return {'message': 'Search query (q) is required'}, 400
+        try:
+            fields = requested_fields('summary')
+        except ValueError as e:
+            return {'message': str(e)}, 400
+        
+        page = max(request.args.get('page', 1, type=int), 1)
+        per_page = page_size()
+        include_total = request.args.get('include_total', 'false').lower() == 'true'
+        
+        try:
+            matches = ranked_matches(q, request.args.get('status'))
+        except SearchNotSupported as e:
+            return {'message': str(e)}, 501
+        rows = []
+        if matches is not None:
+            rows = db.session.execute(matches.limit(per_page).offset((page - 1) * per_page)).all()
+        
+        # Load the page of posts in one query, then restore rank order
+        posts = {post.id: post for post in post_query(fields).filter(Post.id.in_([row.id for row in rows]))}
+        results = []
+        for row in rows:
+            if row.id in posts:
+                result = serialize_post(posts[row.id], fields)
+                result['score'] = row.score
+                results.append(result)
+        if caching_response():
+            cache_depends_on(COLLECTION, *post_dependencies(posts.values(), fields))
+        
+        response = {
+            'posts': results,
+            'query': q,
+            'current_page': page
+        }
+        if include_total:
+            response['total'] = db.session.execute(
+                select(func.count()).select_from(matches.order_by(None).subquery())).scalar() if matches is not None else 0
+        return jsonify(response)
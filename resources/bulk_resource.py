@@ -0,0 +1,222 @@
+# bulk_resource.py
+from flask_restful import Resource
+from flask import request, Response, stream_with_context
+from sqlalchemy import insert, select
+from sqlalchemy.exc import IntegrityError
+from models import db, Post, User, post_tags
+from datetime import datetime
+import json
+import logging
+import uuid
+from slugify import slugify
+from markdown_render import refresh_body_html
+from tagging import normalize_tag, resolve_tag_map
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 500
+MAX_CHUNK_SIZE = 5000
+
+# Optional fields that must be strings when present
+OPTIONAL_TEXT_FIELDS = ('slug', 'excerpt', 'status', 'cover_image')
+
+# Returned for rows that failed for a reason other than their own content
+GENERIC_ERROR = 'Could not create post'
+
+
+def build_row(data):
+    """
+    Validate one NDJSON record with the same rules as POST /api/v1/posts and
+    the Post/Tag validators. Returns (posts row, tag names); raises ValueError.
+    """
+    if not isinstance(data, dict):
+        raise ValueError('Each line must be a JSON object')
+    for name in ('title', 'body', 'author_id'):
+        if not isinstance(data.get(name), str) or not data[name]:
+            raise ValueError(f'{name} is required')
+    for name in OPTIONAL_TEXT_FIELDS:
+        if data.get(name) is not None and not isinstance(data[name], str):
+            raise ValueError(f'{name} must be a string')
+
+    # A transient Post runs the @validates hooks and renders the body like an ORM insert would
+    status = data.get('status') or 'draft'
+    post = Post(
+        id=str(uuid.uuid4()),
+        title=data['title'],
+        slug=data.get('slug') or slugify(data['title']),
+        excerpt=data.get('excerpt', ''),
+        body=data['body'],
+        status=status,
+        cover_image=data.get('cover_image', ''),
+        author_id=data['author_id']
+    )
+    refresh_body_html(post)
+
+    tags = data.get('tags') or []
+    if not isinstance(tags, list) or not all(isinstance(tag, str) for tag in tags):
+        raise ValueError('tags must be a list of strings')
+    tag_names = []
+    for tag in tags:
+        name, _ = normalize_tag(tag)
+        if name not in tag_names:
+            tag_names.append(name)
+
+    now = datetime.utcnow()
+    row = {
+        'id': post.id,
+        'title': post.title,
+        'slug': post.slug,
+        'excerpt': post.excerpt,
+        'body': post.body,
+        'body_html': post.body_html,
+        'body_hash': post.body_hash,
+        'status': post.status,
+        'cover_image': post.cover_image,
+        'author_id': post.author_id,
+        'created_at': now,
+        'updated_at': now,
+        'published_at': now if status == 'published' else None,
+        'views': 0,
+    }
+    # VARCHAR limits are only enforced by some databases; check them here for all
+    for name, value in row.items():
+        length = getattr(Post.__table__.c[name].type, 'length', None)
+        if length and isinstance(value, str) and len(value) > length:
+            raise ValueError(f'{name} cannot exceed {length} characters')
+    return row, tag_names
+
+
+def parse_lines(stream):
+    """Yield (line number, row, tag names, error) for each non-blank line of `stream`"""
+    for number, raw in enumerate(stream, 1):
+        try:
+            line = raw.decode('utf-8').strip()
+            if not line:
+                continue
+            row, tag_names = build_row(json.loads(line))
+        except UnicodeDecodeError:
+            yield number, None, None, 'Line is not valid UTF-8'
+        except json.JSONDecodeError as e:
+            yield number, None, None, f'Invalid JSON: {e}'
+        except ValueError as e:
+            yield number, None, None, str(e)
+        else:
+            yield number, row, tag_names, None
+
+
+def insert_posts(rows, tag_map):
+    """Multi-row INSERTs for `rows` (list of (row, tag names)) and their post_tags links"""
+    db.session.execute(insert(Post), [row for row, _ in rows])
+    # Different names can resolve to one tag (same slug); link it once
+    links = [{'post_id': row['id'], 'tag_id': tag_id}
+             for row, names in rows
+             for tag_id in dict.fromkeys(tag_map[name].id for name in names if name in tag_map)]
+    if links:
+        db.session.execute(insert(post_tags), links)
+
+
+def write_chunk(chunk, results):
+    """
+    Insert the valid rows of `chunk` in one transaction and return a result
+    per line, also recorded in `results` as they are known. Authors, slugs
+    and tags are looked up with one query each.
+    """
+    results.update((number, {'line': number, 'status': 'error', 'message': error})
+                   for number, row, _, error in chunk if error)
+    candidates = [(number, row, names) for number, row, names, error in chunk if not error]
+    if not candidates:
+        return [results[number] for number, *_ in chunk]
+
+    authors = set(db.session.scalars(
+        select(User.id).where(User.id.in_({row['author_id'] for _, row, _ in candidates}))))
+    taken = set(db.session.scalars(
+        select(Post.slug).where(Post.slug.in_({row['slug'] for _, row, _ in candidates}))))
+
+    accepted = []
+    for number, row, names in candidates:
+        if row['author_id'] not in authors:
+            results[number] = {'line': number, 'status': 'error', 'message': 'Author not found'}
+        elif row['slug'] in taken:
+            results[number] = {'line': number, 'status': 'error', 'message': 'Slug already exists'}
+        else:
+            taken.add(row['slug'])
+            accepted.append((number, row, names))
+
+    if accepted:
+        try:
+            tag_map = resolve_tag_map({name for _, _, names in accepted for name in names})
+            insert_posts([(row, names) for _, row, names in accepted], tag_map)
+            db.session.commit()
+        except IntegrityError:
+            # Lost a race with another writer: redo the chunk row by row to find the culprits
+            db.session.rollback()
+            accepted = write_rows(accepted, results)
+        for number, row, _ in accepted:
+            results[number] = {'line': number, 'status': 'created', 'id': row['id'], 'slug': row['slug']}
+
+    return [results[number] for number, *_ in chunk]
+
+
+def write_rows(accepted, results):
+    """Insert rows one savepoint at a time, recording failures in `results`"""
+    created = []
+    for number, row, names in accepted:
+        try:
+            with db.session.begin_nested():
+                insert_posts([(row, names)], resolve_tag_map(names))
+            created.append((number, row, names))
+        except IntegrityError:
+            results[number] = {'line': number, 'status': 'error', 'message': integrity_error_message(row)}
+    db.session.commit()
+    return created
+
+
+def integrity_error_message(row):
+    """Why `row` violated a constraint: its slug or author, looked up after the fact"""
+    if db.session.scalar(select(Post.id).where(Post.slug == row['slug'])) is not None:
+        return 'Slug already exists'
+    if db.session.scalar(select(User.id).where(User.id == row['author_id'])) is None:
+        return 'Author not found'
+    return GENERIC_ERROR
+
+
+class BulkPosts(Resource):
+    def post(self):
+        """
+        Create posts from an NDJSON body, one post per line, committing every
+        `chunk_size` lines. Streams back one NDJSON result per line and a summary.
+        """
+        chunk_size = min(max(request.args.get('chunk_size', DEFAULT_CHUNK_SIZE, type=int), 1), MAX_CHUNK_SIZE)
+        stream = request.stream
+
+        def generate():
+            created = failed = 0
+            chunk = []
+            lines = parse_lines(stream)
+            while True:
+                item = next(lines, None)
+                if item is not None:
+                    chunk.append(item)
+                if chunk and (item is None or len(chunk) >= chunk_size):
+                    known = {}
+                    try:
+                        results = write_chunk(chunk, known)
+                    except Exception:
+                        # Nothing in the chunk was written; keep the per-row errors found so far
+                        logger.exception('Bulk post chunk failed')
+                        db.session.rollback()
+                        results = [known[number] if known.get(number, {}).get('status') == 'error'
+                                   else {'line': number, 'status': 'error', 'message': GENERIC_ERROR}
+                                   for number, *_ in chunk]
+                    chunk = []
+                    for result in results:
+                        if result['status'] == 'created':
+                            created += 1
+                        else:
+                            failed += 1
+                        yield json.dumps(result) + '\n'
+                if item is None:
+                    break
+            yield json.dumps({'summary': {'created': created, 'failed': failed}}) + '\n'
+
+        return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
@@ -0,0 +1,30 @@
+# export_resource.py
+from flask_restful import Resource
+from flask import request, Response, stream_with_context
+from export import EXPORT_FORMATS, export_posts, export_query
+from resources.blogs_resource import requested_fields
+
+DEFAULT_BATCH_SIZE = 1000
+MAX_BATCH_SIZE = 10000
+
+
+class PostExport(Resource):
+    def get(self):
+        """
+        Stream every post matching the list filters as NDJSON or CSV
+        (?output=ndjson|csv), read through a server-side cursor.
+        """
+        output = request.args.get('output', 'ndjson')
+        if output not in EXPORT_FORMATS:
+            return {'message': "Output must be either 'ndjson' or 'csv'"}, 400
+        try:
+            fields = requested_fields('full')
+            query = export_query(request.args, fields)
+        except ValueError as e:
+            return {'message': str(e)}, 400
+        batch_size = min(max(request.args.get('batch_size', DEFAULT_BATCH_SIZE, type=int), 1), MAX_BATCH_SIZE)
+
+        return Response(
+            stream_with_context(export_posts(query, fields, output, batch_size)),
+            mimetype=EXPORT_FORMATS[output],
+            headers={'Content-Disposition': f'attachment; filename=posts.{output}'})
@@ -0,0 +1,122 @@
+# search.py
+import logging
+import re
+from sqlalchemy import DDL, event, func, literal_column, select, table, column
+from sqlalchemy.engine import make_url
+from models import db, Post
+
+logger = logging.getLogger(__name__)
+
+# Databases with a full-text index behind ranked_matches()
+SUPPORTED_DIALECTS = ('postgresql', 'sqlite')
+
+
+class SearchNotSupported(Exception):
+    """The database has no full-text search this module can use"""
+
+# Postgres: a stored tsvector column (kept current by the database on every
+# INSERT/UPDATE) weighted title > excerpt > body, behind a GIN index
+POSTGRES_DDL = [
+    """
+    ALTER TABLE posts ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(excerpt, '')), 'B') ||
+        setweight(to_tsvector('english', coalesce(body, '')), 'C')
+    ) STORED
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_posts_search_vector ON posts USING gin (search_vector)",
+]
+
+# SQLite: an external-content FTS5 table shadowing posts, maintained by triggers
+SQLITE_DDL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS posts_fts USING fts5(
+        title, excerpt, body, content='posts', content_rowid='rowid'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS posts_fts_ai AFTER INSERT ON posts BEGIN
+        INSERT INTO posts_fts(rowid, title, excerpt, body)
+        VALUES (new.rowid, new.title, new.excerpt, new.body);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS posts_fts_ad AFTER DELETE ON posts BEGIN
+        INSERT INTO posts_fts(posts_fts, rowid, title, excerpt, body)
+        VALUES ('delete', old.rowid, old.title, old.excerpt, old.body);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS posts_fts_au AFTER UPDATE OF title, excerpt, body ON posts BEGIN
+        INSERT INTO posts_fts(posts_fts, rowid, title, excerpt, body)
+        VALUES ('delete', old.rowid, old.title, old.excerpt, old.body);
+        INSERT INTO posts_fts(rowid, title, excerpt, body)
+        VALUES (new.rowid, new.title, new.excerpt, new.body);
+    END
+    """,
+]
+
+# Create the search structures alongside the posts table (db.create_all)
+for statement in POSTGRES_DDL:
+    event.listen(Post.__table__, 'after_create', DDL(statement).execute_if(dialect='postgresql'))
+for statement in SQLITE_DDL:
+    event.listen(Post.__table__, 'after_create', DDL(statement).execute_if(dialect='sqlite'))
+
+posts_fts = table('posts_fts', column('rowid'))
+
+
+def is_search_object(name, type_, table_name=None):
+    """
+    Whether a reflected schema object is part of the search DDL above rather
+    than the models (so migration autogenerate must not drop it): the FTS5
+    table and its shadow tables, or the tsvector column and its index.
+    """
+    if type_ == 'table':
+        return name == 'posts_fts' or name.startswith('posts_fts_')
+    if type_ == 'column':
+        return table_name == 'posts' and name == 'search_vector'
+    if type_ == 'index':
+        return name == 'ix_posts_search_vector'
+    return False
+
+
+def init_app(app):
+    """Warn at startup when the database cannot serve /api/v1/posts/search"""
+    url = app.config.get('SQLALCHEMY_DATABASE_URI')
+    dialect = make_url(url).get_backend_name() if url else None
+    if dialect is not None and dialect not in SUPPORTED_DIALECTS:
+        logger.warning('Full-text search is not supported on %s; /api/v1/posts/search will answer 501', dialect)
+
+
+def _fts5_query(q):
+    """Quote every word so user input cannot use (or break) FTS5 query syntax"""
+    return ' '.join(f'"{word}"' for word in re.findall(r'\w+', q))
+
+
+def ranked_matches(q, status=None):
+    """
+    SELECT of (id, score) for posts matching `q`, best match first.
+    Returns None when `q` has nothing searchable in it.
+    """
+    dialect = db.session.get_bind().dialect.name
+    if dialect == 'postgresql':
+        query = func.websearch_to_tsquery('english', q)
+        vector = literal_column('posts.search_vector')
+        score = func.ts_rank_cd(vector, query)
+        stmt = select(Post.id, score.label('score')).where(vector.op('@@')(query))
+    elif dialect == 'sqlite':
+        match = _fts5_query(q)
+        if not match:
+            return None
+        # bm25() is lower-is-better, with columns weighted like the Postgres vector
+        score = -func.bm25(literal_column('posts_fts'), 10.0, 4.0, 1.0)
+        stmt = (select(Post.id, score.label('score'))
+                .select_from(Post.__table__.join(posts_fts, posts_fts.c.rowid == literal_column('posts.rowid')))
+                .where(literal_column('posts_fts').op('MATCH')(match)))
+    else:
+        raise SearchNotSupported(f'Full-text search is not supported on {dialect}')
+
+    if status:
+        stmt = stmt.where(Post.status == status)
+    return stmt.order_by(literal_column('score').desc(), Post.created_at.desc(), Post.id.desc())
@@ -1,11 +1,19 @@
 #!/usr/bin/env python3
 
 from app import app  # Import your Flask app
-from models import db, User, Post, Tag
+from models import db, User, Post, Tag, post_tags
 from werkzeug.security import generate_password_hash
+from markdown_render import render_with_digest
+from sqlalchemy import insert, select
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta, timezone
+import argparse
+import csv
+import io
 import random
 import re
+import time
+import uuid
 
 # Custom slugify function to avoid compatibility issues
 def create_slug(text):
@@ -26,13 +34,13 @@ def clear_data():
     print("🗑️  Clearing existing data...")
     
     try:
-        # Clear association table first (if it exists)
-        db.session.execute(db.text("DELETE FROM post_tags"))
-        
-        # Clear main tables
-        Post.query.delete()
-        Tag.query.delete()
-        User.query.delete()
+        if db.engine.dialect.name == 'postgresql':
+            # One statement, no per-row work, no dead tuples left to vacuum
+            db.session.execute(db.text("TRUNCATE post_tags, posts, tags, users RESTART IDENTITY CASCADE"))
+        else:
+            # Association table first, then whole-table deletes (SQLite has no TRUNCATE)
+            for table in ('post_tags', 'posts', 'tags', 'users'):
+                db.session.execute(db.text(f"DELETE FROM {table}"))
         
         db.session.commit()
         print("✅ Data cleared successfully!")
@@ -123,10 +131,8 @@ def create_tags():
     print(f"✅ Created {len(tags)} tags!")
     return tags
 
-def create_posts(users, tags):
-    """Create hospital-related posts"""
-    print("📝 Creating posts...")
-    
+def post_templates():
+    """Hospital-related posts, shared by the sample and bulk seeds"""
     posts_data = [
         {
             'title': 'Alert Hospital Launches New Maternal Health Program',
@@ -417,6 +423,13 @@ Vaccination is one of the most effective public health interventions. Protect yo
     ]
 
     posts_data.extend(additional_posts)
+    return posts_data
+
+def create_posts(users, tags):
+    """Create hospital-related posts"""
+    print("📝 Creating posts...")
+    
+    posts_data = post_templates()
     
     posts = []
     for i, post_data in enumerate(posts_data):
@@ -478,5 +491,142 @@ def seed_database():
         print(f"   - Tags: {len(tags)}")
         print(f"   - Posts: {len(posts)}")
 
+def insert_rows(table, rows):
+    """Bulk-write `rows` (dicts) into `table`: COPY on Postgres, batched multi-row INSERTs elsewhere"""
+    if not rows:
+        return
+    connection = db.session.connection()
+    if connection.dialect.name == 'postgresql':
+        columns = list(rows[0])
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for row in rows:
+            writer.writerow([row[column] for column in columns])
+        buffer.seek(0)
+        cursor = connection.connection.cursor()
+        cursor.copy_expert(f"COPY {table.name} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buffer)
+    else:
+        connection.execute(insert(table), rows)
+
+# Per-process state for bulk_post_rows, set once per pool worker
+_bulk_context = {}
+
+def _init_bulk_worker(context):
+    _bulk_context.update(context)
+
+def bulk_post_rows(bounds):
+    """Generate the posts and post_tags rows numbered start..stop-1"""
+    start, stop = bounds
+    templates = _bulk_context['templates']
+    user_ids = _bulk_context['user_ids']
+    now = _bulk_context['now']
+    rng = random.Random(start)
+    posts, links = [], []
+    for i in range(start, stop):
+        template = templates[i % len(templates)]
+        created_date = now - timedelta(minutes=i, seconds=rng.random())
+        status = rng.choices(['published', 'draft', 'archived'], weights=[0.8, 0.15, 0.05])[0]
+        post_id = str(uuid.uuid4())
+        posts.append({
+            'id': post_id,
+            'title': f"{template['title']} #{i + 1}",
+            'slug': f"{template['slug']}-{i + 1}",
+            'excerpt': template['excerpt'],
+            'body': template['body'],
+            'body_html': template['body_html'],
+            'body_hash': template['body_hash'],
+            'status': status,
+            'author_id': rng.choice(user_ids),
+            'created_at': created_date,
+            'updated_at': created_date,
+            'published_at': created_date + timedelta(hours=rng.randint(1, 48)) if status == 'published' else None,
+            'views': rng.randint(10, 1000) if status == 'published' else 0,
+        })
+        tag_ids = template['tag_ids']
+        for tag_id in rng.sample(tag_ids, min(len(tag_ids), rng.randint(2, 5))):
+            links.append({'post_id': post_id, 'tag_id': tag_id})
+    return posts, links
+
+def seed_bulk(scale, workers=1, batch_size=10000):
+    """Seed scale x 1000 posts built from the sample posts, bypassing the ORM"""
+    total = int(scale * 1000)
+    print(f"🌱 Bulk seeding {total} posts...")
+    started = time.perf_counter()
+    
+    with app.app_context():
+        create_tables()
+        clear_data()
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        
+        # Every generated user shares the dev password, so hash it once
+        password_hash = generate_password_hash('password123')
+        user_rows = [{
+            'id': str(uuid.uuid4()),
+            'name': f'Staff Member {n + 1}',
+            'email': f'staff{n + 1}@alerthospital.org',
+            'password_hash': password_hash,
+            'created_at': now - timedelta(days=n % 365),
+            'updated_at': now,
+        } for n in range(max(5, total // 100))]
+        insert_rows(User.__table__, user_rows)
+        
+        templates = post_templates()
+        tag_names = sorted({name for template in templates for name in template['tags']})
+        insert_rows(Tag.__table__, [{'name': name, 'slug': create_slug(name)} for name in tag_names])
+        tag_ids = dict(db.session.execute(select(Tag.name, Tag.id)).all())
+        
+        # Render each template body once instead of once per post
+        rendered = []
+        for template in templates:
+            body_html, body_hash = render_with_digest(template['body'])
+            rendered.append({
+                'title': template['title'],
+                'slug': create_slug(template['title']),
+                'excerpt': template['excerpt'],
+                'body': template['body'],
+                'body_html': body_html,
+                'body_hash': body_hash,
+                'tag_ids': [tag_ids[name] for name in template['tags']],
+            })
+        db.session.commit()
+        print(f"✅ Created {len(user_rows)} users and {len(tag_ids)} tags!")
+        
+        context = {'templates': rendered, 'user_ids': [row['id'] for row in user_rows], 'now': now}
+        bounds = [(start, min(start + batch_size, total)) for start in range(0, total, batch_size)]
+        if workers > 1:
+            pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_bulk_worker, initargs=(context,))
+            batches = pool.map(bulk_post_rows, bounds)
+        else:
+            pool = None
+            _init_bulk_worker(context)
+            batches = map(bulk_post_rows, bounds)
+        
+        created = 0
+        try:
+            for posts, links in batches:
+                insert_rows(Post.__table__, posts)
+                insert_rows(post_tags, links)
+                db.session.commit()
+                created += len(posts)
+                print(f"   {created}/{total} posts ({created / (time.perf_counter() - started):.0f}/s)", end='\r')
+        finally:
+            if pool is not None:
+                pool.shutdown()
+        
+        print()
+        print(f"🎉 Bulk seeding completed in {time.perf_counter() - started:.1f}s!")
+
 if __name__ == '__main__':
-    seed_database()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description='Seed the database with sample data.')
+    parser.add_argument('--bulk', action='store_true',
+                        help='Generate a large dataset with COPY/batched inserts instead of the sample posts')
+    parser.add_argument('--scale', type=float, default=1,
+                        help='Bulk mode: thousands of posts to generate (1000 = one million)')
+    parser.add_argument('--workers', type=int, default=1, help='Bulk mode: processes generating rows')
+    parser.add_argument('--batch-size', type=int, default=10000, help='Bulk mode: posts written per batch')
+    args = parser.parse_args()
+    
+    if args.bulk:
+        seed_bulk(args.scale, args.workers, args.batch_size)
+    else:
+        seed_database()
\ No newline at end of file
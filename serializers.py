@@ -0,0 +1,116 @@
+# serializers.py
+from sqlalchemy import Date, DateTime, inspect as sa_inspect
+from sqlalchemy.orm import configure_mappers
+from models import User, Tag, Post
+from metrics import serialization_timer
+
+# Columns that must never leave the API
+EXCLUDED_COLUMNS = {
+    User: {'password_hash'},
+    Post: {'body_hash'},
+}
+
+# Relationships embedded in a model's output: name -> (related model, is a collection)
+EMBEDDED_RELATIONS = {
+    Post: {'author': (User, False), 'tags': (Tag, True)},
+}
+
+_compiled = {}
+
+
+def _iso(value):
+    return value.isoformat() if value is not None else None
+
+
+def _compile(model, fields):
+    """Build a flat row -> dict function for `model` restricted to `fields`"""
+    mapper = sa_inspect(model)
+    relations = EMBEDDED_RELATIONS.get(model, {})
+
+    plain, temporal, embedded = [], [], []
+    for key in fields:
+        if key in relations:
+            related, many = relations[key]
+            embedded.append((key, serializer_for(related), many))
+            continue
+        column = mapper.columns[key]
+        if isinstance(column.type, (DateTime, Date)):
+            temporal.append(key)
+        else:
+            plain.append(key)
+
+    plain, temporal, embedded = tuple(plain), tuple(temporal), tuple(embedded)
+
+    def serialize(obj):
+        data = {key: getattr(obj, key) for key in plain}
+        for key in temporal:
+            data[key] = _iso(getattr(obj, key))
+        for key, nested, many in embedded:
+            value = getattr(obj, key)
+            if many:
+                data[key] = [nested(item) for item in value]
+            else:
+                data[key] = nested(value) if value is not None else None
+        return data
+
+    return serialize
+
+
+def default_fields(model):
+    """All serializable columns of `model` followed by its embedded relations"""
+    excluded = EXCLUDED_COLUMNS.get(model, set())
+    columns = [attr.key for attr in sa_inspect(model).column_attrs if attr.key not in excluded]
+    return tuple(columns) + tuple(EMBEDDED_RELATIONS.get(model, {}))
+
+
+def serializer_for(model, fields=None):
+    """Return the compiled serializer for `model`, building it on first use"""
+    key = (model, tuple(fields) if fields is not None else None)
+    serializer = _compiled.get(key)
+    if serializer is None:
+        serializer = _compiled[key] = _compile(model, key[1] or default_fields(model))
+    return serializer
+
+
+def serialize_post(post, fields=None):
+    with serialization_timer():
+        return serializer_for(Post, fields)(post)
+
+
+# Named projections accepted by ?fields=
+POST_FIELDSETS = {
+    'summary': ('id', 'title', 'slug', 'excerpt', 'cover_image', 'status', 'author_id',
+                'created_at', 'updated_at', 'published_at', 'views', 'author', 'tags'),
+}
+
+
+def parse_fields(model, spec, default):
+    """
+    Resolve a ?fields= value (a fieldset name or comma separated field names)
+    into a tuple of fields in the model's canonical order. `id` is always kept.
+    """
+    available = default_fields(model)
+    fieldsets = dict(POST_FIELDSETS if model is Post else {}, full=available)
+    if not spec:
+        spec = default
+
+    requested = set()
+    for name in (part.strip() for part in spec.split(',')):
+        if not name:
+            continue
+        if name in fieldsets:
+            requested.update(fieldsets[name])
+        elif name in available:
+            requested.add(name)
+        else:
+            raise ValueError(f"Unknown field '{name}'")
+
+    requested.add('id')
+    return tuple(key for key in available if key in requested)
+
+
+def init_serializers():
+    """Configure mappers and compile the default serializers up front"""
+    configure_mappers()
+    for model in (Tag, User, Post):
+        serializer_for(model)
@@ -0,0 +1,68 @@
+# tagging.py
+from slugify import slugify
+from sqlalchemy import insert, select
+from sqlalchemy.dialects import postgresql, sqlite
+from models import db, Tag
+
+
+def _insert_tags_ignoring_conflicts(rows):
+    """INSERT tag rows in one statement, skipping names/slugs that already exist"""
+    dialect = db.session.get_bind().dialect.name
+    if dialect == 'postgresql':
+        stmt = postgresql.insert(Tag).on_conflict_do_nothing()
+    elif dialect == 'sqlite':
+        stmt = sqlite.insert(Tag).on_conflict_do_nothing()
+    else:
+        stmt = insert(Tag)
+    return list(db.session.scalars(stmt.returning(Tag), rows))
+
+
+def normalize_tag(tag_name):
+    """(name, slug) for a tag name, checked by the Tag validators"""
+    tag = Tag(name=tag_name, slug=slugify(tag_name or ''))
+    return tag.name, tag.slug
+
+
+def resolve_tag_map(tag_names):
+    """
+    Map each normalized tag name in `tag_names` to its Tag, creating the missing ones.
+
+    Costs at most three round trips however many tags there are: one IN
+    lookup, one bulk insert-on-conflict for the missing names, and one
+    lookup for names a concurrent writer created in the meantime.
+    """
+    # Normalize through the model validators and drop duplicates, keeping order
+    candidates = {}
+    for tag_name in tag_names or []:
+        name, slug = normalize_tag(tag_name)
+        candidates.setdefault(name, slug)
+    if not candidates:
+        return {}
+
+    found = {tag.name: tag for tag in db.session.scalars(
+        select(Tag).where(Tag.name.in_(candidates)))}
+
+    missing = [{'name': name, 'slug': slug} for name, slug in candidates.items() if name not in found]
+    if missing:
+        found.update((tag.name, tag) for tag in _insert_tags_ignoring_conflicts(missing))
+
+        # Rows skipped by ON CONFLICT: created concurrently, or another name with the same slug
+        lost = [row for row in missing if row['name'] not in found]
+        if lost:
+            slugs = {row['slug']: row['name'] for row in lost}
+            for tag in db.session.scalars(select(Tag).where(
+                    Tag.name.in_(slugs.values()) | Tag.slug.in_(slugs))):
+                found.setdefault(tag.name, tag)
+                if tag.slug in slugs:
+                    found.setdefault(slugs[tag.slug], tag)
+
+    return {name: found[name] for name in candidates if name in found}
+
+
+def resolve_tags(tag_names):
+    """Return Tag objects for `tag_names`, creating the missing ones (see resolve_tag_map)"""
+    tags = []
+    for tag in resolve_tag_map(tag_names).values():
+        if tag not in tags:
+            tags.append(tag)
+    return tags
@@ -0,0 +1,67 @@
+# conftest.py
+import os
+from datetime import datetime, timedelta
+import pytest
+
+# app.py also builds a module-level app from the environment when imported
+os.environ.setdefault('CONNECTION_STRING', 'sqlite://')
+
+from app import create_app
+from models import db, User, Post, Tag
+from query_audit import query_budget
+
+# Views, bus and replicas off so every query a test counts comes from the request itself
+TEST_CONFIG = {
+    'TESTING': True,
+    'SQLALCHEMY_DATABASE_URI': 'sqlite://',
+    'REPLICA_URLS': None,
+    'RESPONSE_CACHE_ENABLED': False,
+    'CACHE_BUS': 'none',
+    'VIEW_COUNTS_ENABLED': False,
+    'METRICS_DIR': None,
+}
+
+
+@pytest.fixture
+def app():
+    app = create_app(TEST_CONFIG, warm=False)
+    with app.app_context():
+        # Only the primary: db remembers bind keys (e.g. replica_0) from other tests' apps
+        db.create_all(bind_key=None)
+        yield app
+        db.session.remove()
+        db.drop_all(bind_key=None)
+
+
+@pytest.fixture
+def max_queries():
+    """`with max_queries(3): client.get(...)` fails unless the block runs at most 3 statements"""
+    return query_budget
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def posts(app):
+    """20 posts over 4 authors and 5 tags, half of them published, newest last"""
+    authors = [User(name=f'Author {n}', email=f'author-{n}@example.org', password_hash='x') for n in range(4)]
+    tags = [Tag(name=f'Topic {n}', slug=f'topic-{n}') for n in range(5)]
+    db.session.add_all(authors + tags)
+    created = datetime(2024, 1, 1)
+    posts = []
+    for i in range(20):
+        post = Post(title=f'Post {i}', slug=f'post-{i}', excerpt=f'Excerpt {i}',
+                    body=f'# Heading {i}\n\nSome *markdown* about clinics and vaccines.',
+                    status='published' if i % 2 else 'draft', author=authors[i % 4],
+                    created_at=created + timedelta(hours=i))
+        post.tags = [tags[i % 5], tags[(i + 2) % 5]]
+        posts.append(post)
+    db.session.add_all(posts)
+    db.session.commit()
+    ids = [post.id for post in posts]
+    # Requests must load what they serialize themselves, not find it in the identity map
+    db.session.expunge_all()
+    return ids
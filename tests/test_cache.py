@@ -0,0 +1,54 @@
+# test_cache.py
+"""Conditional requests answered from the response cache."""
+import pytest
+
+
+@pytest.fixture
+def view_counter(app):
+    counter = app.extensions['view_counter']
+    counter.enabled = True
+    yield counter
+    # Write what the test left buffered while the database still exists
+    counter.enabled = False
+    counter.flush()
+
+
+def test_if_none_match_star_on_cached_search(app, client, posts):
+    # Search responses carry no ETag, so a cache hit must not turn `*` into a 304
+    app.extensions['response_cache'].enabled = True
+    first = client.get('/api/v1/posts/search?q=vaccines')
+    assert first.status_code == 200 and first.get_etag() == (None, None)
+    second = client.get('/api/v1/posts/search?q=vaccines', headers={'If-None-Match': '*'})
+    assert second.status_code == 200
+    assert second.json == first.json
+
+
+def test_cached_post_revalidates(app, client, posts):
+    app.extensions['response_cache'].enabled = True
+    etag = client.get(f'/api/v1/posts/{posts[3]}').get_etag()[0]
+    response = client.get(f'/api/v1/posts/{posts[3]}', headers={'If-None-Match': f'"{etag}"'})
+    assert response.status_code == 304
+    assert response.get_etag()[0] == etag
+
+
+def test_flushed_views_change_etag_and_drop_cached_post(app, client, posts, view_counter):
+    app.extensions['response_cache'].enabled = True
+    url = '/api/v1/posts/slug/post-3'
+    first = client.get(url)
+    etag = first.get_etag()[0]
+    assert first.json['views'] == 0 and first.last_modified is None
+    client.get(url)
+    view_counter.flush()
+
+    # Neither the response cache nor a revalidation may keep serving the old count
+    assert client.get(url, headers={'If-None-Match': f'"{etag}"'}).status_code == 200
+    second = client.get(url)
+    assert second.json['views'] == 2
+    assert second.get_etag()[0] != etag
+
+
+def test_flushed_views_change_list_etag(client, posts, view_counter):
+    etag = client.get('/api/v1/posts').get_etag()[0]
+    client.get(f'/api/v1/posts/{posts[19]}')
+    view_counter.flush()
+    assert client.get('/api/v1/posts', headers={'If-None-Match': f'"{etag}"'}).status_code == 200
@@ -0,0 +1,94 @@
+# test_cache_bus.py
+"""
+Cross-worker invalidation over the local bus: workers forked from one app
+(as gunicorn does with preload) each cache a post, one of them edits it, and
+every other worker must drop its copy.
+"""
+import multiprocessing
+import queue
+import time
+import traceback
+import pytest
+from conftest import TEST_CONFIG
+from app import create_app
+from models import db, User, Post
+
+WORKERS = 3
+TIMEOUT = 10
+
+pytestmark = pytest.mark.skipif('fork' not in multiprocessing.get_all_start_methods(),
+                                reason='needs fork, like gunicorn workers')
+
+
+@pytest.fixture
+def bus_app(tmp_path):
+    # A file database, so every worker process sees the same rows
+    app = create_app(dict(TEST_CONFIG,
+                          SQLALCHEMY_DATABASE_URI=f'sqlite:///{tmp_path / "blog.db"}',
+                          RESPONSE_CACHE_ENABLED=True,
+                          CACHE_BUS='local',
+                          CACHE_BUS_DIR=str(tmp_path / 'bus'),
+                          CACHE_BUS_POLL_INTERVAL=0.1), warm=False)
+    with app.app_context():
+        db.create_all(bind_key=None)
+        author = User(name='Author', email='author@example.org', password_hash='x')
+        post = Post(title='Original', slug='shared-post', body='Body', status='published', author=author)
+        db.session.add(post)
+        db.session.commit()
+        app.config['TEST_POST'] = (post.id, author.id)
+        # Like gunicorn's post_fork: children must not share the parent's pooled connections
+        db.engine.dispose()
+    yield app
+    # Seeding published an invalidation, which started this process's listener
+    app.extensions['response_cache'].bus.stop()
+
+
+def worker(app, index, cached, written, results):
+    try:
+        post_id, author_id = app.config['TEST_POST']
+        cache = app.extensions['response_cache']
+        with app.app_context():
+            client = app.test_client()
+            assert client.get('/api/v1/posts/slug/shared-post').json['title'] == 'Original'
+            assert cache.stats()['entries'] == 1
+            cached.wait(TIMEOUT)
+
+            if index == 0:
+                response = client.put(f'/api/v1/posts/{post_id}',
+                                      json={'title': 'Changed', 'body': 'Body', 'author_id': author_id})
+                assert response.status_code == 200, response.get_data(as_text=True)
+            written.wait(TIMEOUT)
+
+            # The writer invalidates locally; the others wait for the bus
+            deadline = time.monotonic() + TIMEOUT
+            while cache.stats()['entries'] and time.monotonic() < deadline:
+                time.sleep(0.05)
+            title = client.get('/api/v1/posts/slug/shared-post').json['title']
+            results.put((index, title, cache.remote_invalidations, None))
+    except BaseException:
+        results.put((index, None, None, traceback.format_exc()))
+
+
+def test_write_in_one_worker_evicts_the_others(bus_app):
+    context = multiprocessing.get_context('fork')
+    cached, written = context.Barrier(WORKERS), context.Barrier(WORKERS)
+    results = context.Queue()
+    processes = [context.Process(target=worker, args=(bus_app, index, cached, written, results))
+                 for index in range(WORKERS)]
+    for process in processes:
+        process.start()
+    try:
+        outcomes = sorted(results.get(timeout=3 * TIMEOUT) for _ in processes)
+    except queue.Empty:
+        pytest.fail('a worker did not report back')
+    finally:
+        for process in processes:
+            process.join(TIMEOUT)
+            if process.is_alive():
+                process.kill()
+
+    for index, title, remote, error in outcomes:
+        assert error is None, error
+        assert title == 'Changed', f'worker {index} served a stale post'
+        if index:
+            assert remote >= 1, f'worker {index} got no invalidation from the bus'
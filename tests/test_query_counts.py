@@ -0,0 +1,83 @@
+# test_query_counts.py
+"""
+Fixed query counts for the read endpoints: a page costs the same number of
+statements whatever its size, so an N+1 regression fails here first.
+"""
+import pytest
+
+
+@pytest.fixture
+def get(client, max_queries):
+    def get(url, queries):
+        """GET `url`, failing unless it runs exactly `queries` statements"""
+        with max_queries(queries) as budget:
+            response = client.get(url)
+        assert response.status_code == 200, response.get_data(as_text=True)
+        assert budget.count == queries, budget.statements
+        return response
+    return get
+
+
+@pytest.mark.parametrize('per_page', [5, 20])
+def test_list_offset(get, posts, per_page):
+    # Collection validators (total, ETag), the page with joined authors, its tags
+    response = get(f'/api/v1/posts?per_page={per_page}', 3)
+    assert len(response.json['posts']) == per_page
+    assert response.json['total'] == 20
+
+
+@pytest.mark.parametrize('per_page', [5, 20])
+def test_list_without_total(get, posts, per_page):
+    # The page ETag comes from the loaded rows, so the aggregate is skipped
+    response = get(f'/api/v1/posts?per_page={per_page}&include_total=false', 2)
+    assert len(response.json['posts']) == per_page
+
+
+def test_list_cursor(get, posts):
+    first = get('/api/v1/posts?after=&per_page=5', 2)
+    cursor = first.json['next_cursor']
+    second = get(f'/api/v1/posts?after={cursor}&per_page=5', 2)
+    assert [post['slug'] for post in second.json['posts']] == [f'post-{i}' for i in range(14, 9, -1)]
+
+
+def test_list_filtered(get, posts):
+    response = get('/api/v1/posts?status=published&tags=Topic 1,Topic 3&match=any&per_page=20', 3)
+    assert response.json['total'] == len(response.json['posts']) == 6
+
+
+def test_list_sparse_fields(get, posts):
+    # No tags requested: no tags query
+    response = get('/api/v1/posts?fields=title,author&per_page=20&include_total=false', 1)
+    assert all(post['author']['name'] for post in response.json['posts'])
+
+
+def test_detail(get, posts):
+    # The post with its author, then its tags
+    response = get(f'/api/v1/posts/{posts[3]}', 2)
+    assert response.json['slug'] == 'post-3'
+    assert len(response.json['tags']) == 2
+
+
+def test_detail_by_slug(get, posts):
+    response = get('/api/v1/posts/slug/post-3', 2)
+    assert response.json['id'] == posts[3]
+
+
+@pytest.mark.parametrize('per_page', [5, 20])
+def test_search(get, posts, per_page):
+    # Ranked ids, the posts on the page, their tags
+    response = get(f'/api/v1/posts/search?q=vaccines&per_page={per_page}', 3)
+    assert len(response.json['posts']) == per_page
+
+
+def test_search_total(get, posts):
+    response = get('/api/v1/posts/search?q=vaccines&include_total=true', 4)
+    assert response.json['total'] == 20
+
+
+def test_cached_responses_run_no_queries(app, get, posts):
+    app.extensions['response_cache'].enabled = True
+    get('/api/v1/posts', 3)
+    get('/api/v1/posts', 0)
+    get(f'/api/v1/posts/{posts[3]}', 2)
+    get(f'/api/v1/posts/{posts[3]}', 0)
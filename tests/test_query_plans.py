@@ -0,0 +1,33 @@
+# test_query_plans.py
+"""
+Every listing query must be served by an index rather than a full scan of
+posts followed by a sort (the same check as `flask posts check-plans`).
+"""
+import pytest
+from commands import LISTING_FILTERS, LISTING_MODES, filter_label, listing_plan
+from models import db, Post
+from query_plans import scans_and_sorts
+
+
+@pytest.mark.parametrize('mode', LISTING_MODES)
+@pytest.mark.parametrize('filters', LISTING_FILTERS, ids=filter_label)
+def test_listing_query_uses_an_index(app, filters, mode):
+    connection = db.session.connection()
+    plan = listing_plan(connection, filters, mode)
+    assert not scans_and_sorts(plan, connection.dialect.name), '\n'.join(plan)
+
+
+# Tag filters are driven from post_tags and fetch posts by primary key, so they do not need these
+UNTAGGED_FILTERS = [filters for filters in LISTING_FILTERS if 'tag' not in filters and 'tags' not in filters]
+
+
+@pytest.mark.parametrize('mode', LISTING_MODES)
+@pytest.mark.parametrize('filters', UNTAGGED_FILTERS, ids=filter_label)
+def test_missing_indexes_are_caught(app, filters, mode):
+    # Without the (..., created_at DESC, id DESC) indexes the same check must fail
+    connection = db.session.connection()
+    for index in Post.__table__.indexes:
+        if index.name.endswith('_created_at_id'):
+            index.drop(connection)
+    plan = listing_plan(connection, filters, mode)
+    assert scans_and_sorts(plan, connection.dialect.name), '\n'.join(plan)
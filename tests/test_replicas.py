@@ -0,0 +1,109 @@
+# test_replicas.py
+"""
+Read/write routing with a primary and one replica, each a SQLite file. The
+same post carries a different title in each database, so a response shows
+which one answered.
+"""
+from datetime import datetime
+import pytest
+from conftest import TEST_CONFIG
+from app import create_app
+from models import db, User, Post
+
+POST_ID = '00000000-0000-0000-0000-000000000001'
+AUTHOR_ID = '00000000-0000-0000-0000-000000000002'
+COOKIE = 'read_primary'
+
+
+def make_app(tmp_path, replica_url):
+    return create_app(dict(TEST_CONFIG,
+                           SQLALCHEMY_DATABASE_URI=f'sqlite:///{tmp_path / "primary.db"}',
+                           REPLICA_URLS=replica_url), warm=False)
+
+
+def seed(engine, title):
+    db.metadata.create_all(engine)
+    now = datetime.utcnow()
+    with engine.begin() as connection:
+        connection.execute(User.__table__.insert(), {
+            'id': AUTHOR_ID, 'name': 'Author', 'email': 'author@example.org', 'password_hash': 'x',
+            'created_at': now, 'updated_at': now})
+        connection.execute(Post.__table__.insert(), {
+            'id': POST_ID, 'title': title, 'slug': 'routed', 'body': 'Body', 'status': 'published',
+            'author_id': AUTHOR_ID, 'created_at': now, 'updated_at': now, 'views': 0})
+
+
+def titles(engine):
+    with engine.connect() as connection:
+        return set(connection.scalars(Post.__table__.select().with_only_columns(Post.__table__.c.title)))
+
+
+@pytest.fixture
+def app(tmp_path):
+    app = make_app(tmp_path, f'sqlite:///{tmp_path / "replica.db"}')
+    with app.app_context():
+        seed(db.engines[None], 'Primary')
+        seed(db.engines['replica_0'], 'Replica')
+        yield app
+        db.session.remove()
+
+
+@pytest.fixture
+def engines(app):
+    return db.engines[None], db.engines['replica_0']
+
+
+def test_get_reads_from_the_replica(client):
+    assert client.get('/api/v1/posts/slug/routed').json['title'] == 'Replica'
+    assert [post['title'] for post in client.get('/api/v1/posts').json['posts']] == ['Replica']
+    assert client.get_cookie(COOKIE) is None
+
+
+def test_post_writes_to_the_primary(client, engines):
+    primary, replica = engines
+    response = client.post('/api/v1/posts', json={'title': 'Created', 'body': 'Body', 'author_id': AUTHOR_ID})
+    assert response.status_code == 201
+    assert 'Created' in titles(primary) and 'Created' not in titles(replica)
+    assert client.get_cookie(COOKIE) is not None
+
+
+def test_put_writes_to_the_primary(client, engines):
+    primary, replica = engines
+    response = client.put(f'/api/v1/posts/{POST_ID}', json={'title': 'Edited', 'body': 'Body', 'author_id': AUTHOR_ID})
+    assert response.status_code == 200
+    assert titles(primary) == {'Edited'} and titles(replica) == {'Replica'}
+    assert client.get_cookie(COOKIE) is not None
+
+
+def test_delete_writes_to_the_primary(client, engines):
+    primary, replica = engines
+    assert client.delete(f'/api/v1/posts/{POST_ID}').status_code == 200
+    assert titles(primary) == set() and titles(replica) == {'Replica'}
+    assert client.get_cookie(COOKIE) is not None
+
+
+def test_cookie_reads_the_primary_and_skips_the_cache(app, client):
+    cache = app.extensions['response_cache']
+    cache.enabled = True
+    assert client.get('/api/v1/posts/slug/routed').json['title'] == 'Replica'
+    assert cache.stats()['entries'] == 1
+
+    client.set_cookie(COOKIE, '1')
+    before = cache.stats()
+    assert client.get('/api/v1/posts/slug/routed').json['title'] == 'Primary'
+    after = cache.stats()
+    assert (after['hits'], after['misses'], after['entries']) == (before['hits'], before['misses'], before['entries'])
+
+
+def test_unhealthy_replica_falls_back_to_the_primary(app, client):
+    app.extensions['replica_router'].mark_down('replica_0')
+    assert client.get('/api/v1/posts/slug/routed').json['title'] == 'Primary'
+
+
+def test_unreachable_replica_falls_back_to_the_primary(tmp_path):
+    app = make_app(tmp_path, f'sqlite:///{tmp_path / "missing" / "replica.db"}')
+    with app.app_context():
+        seed(db.engines[None], 'Primary')
+        assert app.test_client().get('/api/v1/posts/slug/routed').json['title'] == 'Primary'
+        assert app.extensions['replica_router'].status()['replica_0']['healthy'] is False
+        db.session.remove()
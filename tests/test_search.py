@@ -0,0 +1,27 @@
+# test_search.py
+import logging
+from flask import Flask
+import search
+from models import db
+
+
+def test_search_ranks_matches(client, posts):
+    response = client.get('/api/v1/posts/search?q=vaccines&per_page=3')
+    assert response.status_code == 200
+    assert len(response.json['posts']) == 3
+    assert all('score' in post for post in response.json['posts'])
+
+
+def test_unsupported_database_answers_501(app, client, posts, monkeypatch):
+    monkeypatch.setattr(db.engine.dialect, 'name', 'mysql')
+    response = client.get('/api/v1/posts/search?q=vaccines')
+    assert response.status_code == 501
+    assert response.json == {'message': 'Full-text search is not supported on mysql'}
+
+
+def test_unsupported_database_is_reported_at_startup(caplog):
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'mysql://user@localhost/blog'
+    with caplog.at_level(logging.WARNING, logger='search'):
+        search.init_app(app)
+    assert 'not supported on mysql' in caplog.text
@@ -0,0 +1,157 @@
+# view_counter.py
+import atexit
+import logging
+import os
+import threading
+from collections import Counter
+import weakref
+from functools import wraps
+from sqlalchemy import Integer, String, bindparam, column, select, update, values
+from models import db, Post
+from cache import invalidate_committed
+from extensions import extension_proxy
+
+logger = logging.getLogger(__name__)
+
+
+class ViewCounter:
+    """
+    Buffers post views in memory and adds them to posts.views in batches.
+
+    Each worker flushes every `flush_interval` seconds, as soon as
+    `max_pending` views are buffered, and on shutdown, so a crash loses at
+    most that many views per worker.
+    """
+
+    def __init__(self, flush_interval=5.0, max_pending=1000, enabled=True):
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.enabled = enabled
+        self.app = None
+        self._counts = Counter()
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._pid = None
+
+    def init_app(self, app):
+        app.extensions['view_counter'] = self
+        self.app = app
+        self.flush_interval = float(app.config.get('VIEW_FLUSH_INTERVAL', self.flush_interval))
+        self.max_pending = int(app.config.get('VIEW_FLUSH_MAX_PENDING', self.max_pending))
+        self.enabled = bool(app.config.get('VIEW_COUNTS_ENABLED', self.enabled))
+        _flushing.add(self)
+
+    def record(self, key_column, key):
+        """Count one view of the post whose `key_column` ('id' or 'slug') is `key`"""
+        if not self.enabled:
+            return
+        with self._lock:
+            if self._pid != os.getpid():
+                self._start()
+            self._counts[(key_column, key)] += 1
+            self._pending += 1
+            full = self._pending >= self.max_pending
+        if full:
+            self._wake.set()
+
+    def _start(self):
+        # Called with the lock held, once per process: counts buffered before a fork belong to the parent
+        self._pid = os.getpid()
+        self._counts = Counter()
+        self._pending = 0
+        self._wake = threading.Event()
+        threading.Thread(target=self._run, name='ViewCounter', daemon=True).start()
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception:
+                logger.exception('Could not flush post view counts')
+
+    def flush(self):
+        """Write the buffered counts; they are kept for the next attempt if the write fails"""
+        with self._flush_lock:
+            with self._lock:
+                counts, self._counts = self._counts, Counter()
+                self._pending = 0
+            if not counts:
+                return 0
+            try:
+                with self.app.app_context():
+                    self._write(counts)
+            except Exception:
+                with self._lock:
+                    self._counts.update(counts)
+                    self._pending += sum(counts.values())
+                raise
+            return sum(counts.values())
+
+    def _write(self, counts):
+        posts = Post.__table__
+        # Straight to the engine: bumping views must not touch updated_at; the
+        # cached responses showing these counts are dropped once they are written
+        with db.engine.begin() as connection:
+            for key_column in ('id', 'slug'):
+                rows = [(key, n) for (col, key), n in counts.items() if col == key_column]
+                if not rows:
+                    continue
+                if connection.dialect.name == 'postgresql':
+                    # UPDATE posts SET views = posts.views + v.n FROM (VALUES ...) AS v (key, n)
+                    batch = values(column('key', String), column('n', Integer), name='v').data(rows)
+                    connection.execute(
+                        update(posts)
+                        .where(posts.c[key_column] == batch.c.key)
+                        .values(views=posts.c.views + batch.c.n))
+                else:
+                    connection.execute(
+                        update(posts)
+                        .where(posts.c[key_column] == bindparam('key'))
+                        .values(views=posts.c.views + bindparam('n')),
+                        [{'key': key, 'n': n} for key, n in rows])
+            post_ids = self._cached_post_ids(connection, counts)
+        invalidate_committed({f'post:{post_id}' for post_id in post_ids})
+
+    def _cached_post_ids(self, connection, counts):
+        """Ids of the counted posts, if responses showing their views may be cached"""
+        cache = self.app.extensions.get('response_cache')
+        if cache is None or not cache.enabled:
+            return ()
+        post_ids = {key for (col, key) in counts if col == 'id'}
+        slugs = [key for (col, key) in counts if col == 'slug']
+        if slugs:
+            post_ids.update(connection.scalars(select(Post.__table__.c.id).where(Post.__table__.c.slug.in_(slugs))))
+        return post_ids
+
+
+view_counter = extension_proxy('view_counter')
+
+# Initialized counters; one exit hook flushes them all
+_flushing = weakref.WeakSet()
+
+
+@atexit.register
+def _flush_all():
+    for counter in list(_flushing):
+        try:
+            counter.flush()
+        except Exception:
+            logger.exception('Could not flush post view counts on exit')
+
+
+def counts_views(kwarg, key_column):
+    """Record a view when the wrapped GET answers 200/304 for the post named by `kwarg`"""
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            response = view(*args, **kwargs)
+            key = kwargs.get(kwarg)
+            if key and getattr(response, 'status_code', None) in (200, 304):
+                view_counter.record(key_column, key)
+            return response
+        return wrapper
+    return decorator